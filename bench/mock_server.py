@@ -0,0 +1,207 @@
+import asyncio
+import argparse
+import random
+import secrets
+from time import time
+
+from aiohttp import web
+
+TURBO_DURATION = 20
+
+conf = {
+    'tap_levels': [{'price': 200 * 2 ** index, 'rate': index + 1} for index in range(20)],
+    'energy_levels': [{'price': 300 * 2 ** index, 'limit': 500 * (index + 1)} for index in range(20)],
+    'charge_levels': [{'price': 1000 * 4 ** index, 'rate': index + 1} for index in range(5)],
+}
+
+
+class Player:
+    def __init__(self, energy_limit_bonus: int):
+        self.energy_limit_bonus = energy_limit_bonus
+        self.shares = 0
+        self.earned = 0
+        self.tap_level = 1
+        self.energy_level = 1
+        self.charge_level = 1
+        self.energy = self.max_energy
+        self.energy_boosts = 6
+        self.turbo_boosts = 3
+        self.turbo_end = 0.0
+        self.claims = [f"task_{index}" for index in range(random.randint(0, 3))]
+        self.updated_at = time()
+
+    @property
+    def max_energy(self) -> int:
+        return conf['energy_levels'][self.energy_level - 1]['limit'] + self.energy_limit_bonus
+
+    @property
+    def tap_rate(self) -> int:
+        return conf['tap_levels'][self.tap_level - 1]['rate']
+
+    def regenerate(self) -> None:
+        now = time()
+        charge_rate = conf['charge_levels'][self.charge_level - 1]['rate']
+        self.energy = min(self.max_energy, self.energy + int((now - self.updated_at) * charge_rate))
+        self.updated_at = now
+
+    def tap(self, taps: int) -> None:
+        self.regenerate()
+
+        if self.turbo_end > time():
+            credited = taps * self.tap_rate * 5
+        else:
+            taps = min(taps, self.energy // self.tap_rate)
+            self.energy -= taps * self.tap_rate
+            credited = taps * self.tap_rate
+
+        self.shares += credited
+        self.earned += credited
+
+    def as_dict(self) -> dict:
+        return {
+            'energy': self.energy,
+            'shares': self.shares,
+            'stat': {'earned': self.earned},
+            'boost': [
+                {'type': 'energy', 'cnt': self.energy_boosts},
+                {'type': 'turbo', 'cnt': self.turbo_boosts, 'end': int(self.turbo_end * 1000)},
+            ],
+            'tap_level': self.tap_level,
+            'energy_level': self.energy_level,
+            'charge_level': self.charge_level,
+            'tap_bot': False,
+            'claims': self.claims,
+        }
+
+
+class MockServer:
+    def __init__(self, latency: float, jitter: float, error_rate: float, energy_limit_bonus: int):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.energy_limit_bonus = energy_limit_bonus
+
+        self.players: dict[str, Player] = {}
+        self.requests = 0
+        self.errors = 0
+
+    @web.middleware
+    async def middleware(self, request: web.Request, handler):
+        if request.path == '/stats':
+            return await handler(request)
+
+        self.requests += 1
+
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if random.random() < self.error_rate:
+            self.errors += 1
+            return web.json_response({'message': 'Internal Server Error'}, status=500)
+
+        return await handler(request)
+
+    def get_player(self, request: web.Request) -> Player:
+        token = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        player = self.players.get(token)
+        if player is None:
+            raise web.HTTPUnauthorized()
+
+        return player
+
+    async def challenge(self, request: web.Request) -> web.Response:
+        access_token = secrets.token_hex(16)
+        player = self.players[access_token] = Player(energy_limit_bonus=self.energy_limit_bonus)
+
+        return web.json_response({
+            'access_token': access_token,
+            'player': player.as_dict(),
+            'conf': conf,
+            'bot_shares': 0,
+        })
+
+    async def submit_taps(self, request: web.Request) -> web.Response:
+        player = self.get_player(request)
+        data = await request.json()
+
+        player.tap(int(data['taps']))
+
+        return web.json_response({'player': player.as_dict()})
+
+    async def apply_boost(self, request: web.Request) -> web.Response:
+        player = self.get_player(request)
+        boost_type = (await request.json())['type']
+
+        if boost_type == 'energy' and player.energy_boosts > 0:
+            player.energy_boosts -= 1
+            player.energy = player.max_energy
+        elif boost_type == 'turbo' and player.turbo_boosts > 0:
+            player.turbo_boosts -= 1
+            player.turbo_end = time() + TURBO_DURATION
+        else:
+            raise web.HTTPBadRequest()
+
+        return web.json_response({'player': player.as_dict()})
+
+    async def upgrade(self, request: web.Request) -> web.Response:
+        player = self.get_player(request)
+        boost_type = (await request.json())['type']
+
+        level = getattr(player, f'{boost_type}_level')
+        levels = conf[f'{boost_type}_levels']
+        if level >= len(levels) or player.shares < levels[level]['price']:
+            raise web.HTTPBadRequest()
+
+        player.shares -= levels[level]['price']
+        setattr(player, f'{boost_type}_level', level + 1)
+
+        return web.json_response({'player': player.as_dict()})
+
+    async def claim_reward(self, request: web.Request) -> web.Response:
+        player = self.get_player(request)
+        task_id = (await request.json())['task_id']
+
+        if task_id not in player.claims:
+            raise web.HTTPBadRequest()
+
+        player.claims.remove(task_id)
+        player.shares += 1000
+
+        return web.json_response({'player': player.as_dict()})
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({'requests': self.requests, 'errors': self.errors, 'players': len(self.players)})
+
+    def create_app(self) -> web.Application:
+        app = web.Application(middlewares=[self.middleware])
+        app.add_routes([
+            web.post('/api/account/challenge', self.challenge),
+            web.post('/api/player/submit_taps', self.submit_taps),
+            web.post('/api/player/apply_boost', self.apply_boost),
+            web.post('/api/player/upgrade', self.upgrade),
+            web.post('/api/player/claim_reward', self.claim_reward),
+            web.get('/stats', self.stats),
+        ])
+
+        return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in for the TapSwap API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="Base response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Random extra latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="Share of requests answered with 500")
+    parser.add_argument("--energy-limit-bonus", type=int, default=0, help="Extra energy added to every tank")
+    args = parser.parse_args()
+
+    server = MockServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                        energy_limit_bonus=args.energy_limit_bonus)
+
+    web.run_app(server.create_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == '__main__':
+    main()
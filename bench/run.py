@@ -0,0 +1,185 @@
+import os
+import sys
+import json
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from time import perf_counter
+from types import SimpleNamespace
+
+os.environ.setdefault("API_ID", "0")
+os.environ.setdefault("API_HASH", "bench")
+
+import aiohttp
+from loguru import logger as base_logger
+
+import bot.utils  # noqa: F401
+from bot.config import settings
+from bot.core.tapper import Tapper
+from bot.core.models import PlayerState, Profile, parse_profile
+from bot.core.scheduler import Scheduler
+from bot.utils.storage import SessionStorage
+from bot.utils.connections import connection_pool
+
+
+def percentile(values: list[float], share: float) -> float:
+    if not values:
+        return 0.0
+
+    values = sorted(values)
+    return values[min(int(len(values) * share), len(values) - 1)]
+
+
+def get_rss() -> int:
+    with open("/proc/self/statm") as file:
+        return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+class BenchTapper(Tapper):
+    tap_latencies: list[float] = []
+
+    def __init__(self, index: int, workdir: str):
+        super().__init__(tg_client=SimpleNamespace(name=f"bench_{index:05d}"))
+        self.index = index
+        self.storage = SessionStorage(session_name=self.session_name, workdir=workdir)
+
+    async def get_auth_url(self, proxy: str | None) -> str:
+        self.user_id = 1_000_000 + self.index
+
+        return 'bench'
+
+    async def login(self, http_client: aiohttp.ClientSession, auth_url: str, proxy: str) -> tuple[Profile | None, str]:
+        response = await http_client.post(url=f'{settings.API_URL}/account/challenge', json={})
+        profile = parse_profile(await response.read())
+
+        return profile, profile.access_token
+
+    async def send_taps(self, http_client: aiohttp.ClientSession, taps: int) -> PlayerState | None:
+        started_at = perf_counter()
+        player = await super().send_taps(http_client=http_client, taps=taps)
+        self.tap_latencies.append(perf_counter() - started_at)
+
+        return player
+
+
+async def measure_loop_lag(lags: list[float], interval: float = 0.1) -> None:
+    while True:
+        started_at = perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(perf_counter() - started_at - interval)
+
+
+async def get_server_stats(url: str) -> dict:
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url=f'{url}/stats') as response:
+            return await response.json()
+
+
+async def run_round(sessions: int, duration: float, server_url: str, use_scheduler: bool) -> dict:
+    BenchTapper.tap_latencies = []
+    lags = []
+
+    rss_before = get_rss()
+    stats_before = await get_server_stats(server_url)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        tappers = [BenchTapper(index=index, workdir=workdir) for index in range(sessions)]
+
+        if use_scheduler:
+            scheduler = Scheduler(workers=settings.SCHEDULER_WORKERS)
+            for tapper in tappers:
+                scheduler.schedule(tapper=tapper)
+            tasks = [asyncio.create_task(scheduler.run())]
+        else:
+            tasks = [asyncio.create_task(tapper.run(proxy=None)) for tapper in tappers]
+
+        lag_task = asyncio.create_task(measure_loop_lag(lags))
+
+        await asyncio.sleep(duration)
+        rss_after = get_rss()
+
+        for task in tasks + [lag_task]:
+            task.cancel()
+        await asyncio.gather(*tasks, lag_task, return_exceptions=True)
+
+    stats_after = await get_server_stats(server_url)
+    await connection_pool.close()
+
+    requests = stats_after['requests'] - stats_before['requests']
+
+    return {
+        'sessions': sessions,
+        'requests_per_second': requests / duration,
+        'errors': stats_after['errors'] - stats_before['errors'],
+        'taps_p50_ms': percentile(BenchTapper.tap_latencies, 0.5) * 1000,
+        'taps_p99_ms': percentile(BenchTapper.tap_latencies, 0.99) * 1000,
+        'loop_lag_p99_ms': percentile(lags, 0.99) * 1000,
+        'loop_lag_max_ms': max(lags, default=0) * 1000,
+        'rss_per_session_kb': (rss_after - rss_before) / sessions / 1024,
+    }
+
+
+async def wait_for_server(url: str, timeout: float = 15) -> None:
+    deadline = perf_counter() + timeout
+    while True:
+        try:
+            await get_server_stats(url)
+            return
+        except aiohttp.ClientError:
+            if perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Drive fake sessions against the local mock TapSwap API")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--duration", type=float, default=30, help="Seconds per round")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--sleep-between-tap", type=int, nargs=2, default=[1, 3])
+    parser.add_argument("--scheduler", action="store_true", help="Use the central scheduler instead of tasks")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON lines")
+    args = parser.parse_args()
+
+    server_url = f"http://127.0.0.1:{args.port}"
+
+    settings.API_URL = f"{server_url}/api"
+    settings.SLEEP_BETWEEN_TAP = args.sleep_between_tap
+
+    base_logger.remove()
+    base_logger.add(sink=sys.stderr, level="CRITICAL")
+
+    server = subprocess.Popen([sys.executable, "-m", "bench.mock_server",
+                               "--port", str(args.port),
+                               "--latency", str(args.latency),
+                               "--jitter", str(args.jitter),
+                               "--error-rate", str(args.error_rate),
+                               "--energy-limit-bonus", "1000000"])
+
+    try:
+        await wait_for_server(server_url)
+
+        for sessions in args.sessions:
+            result = await run_round(sessions=sessions, duration=args.duration, server_url=server_url,
+                                     use_scheduler=args.scheduler)
+
+            if args.json:
+                print(json.dumps(result))
+            else:
+                print(f"{result['sessions']:>6} sessions | "
+                      f"{result['requests_per_second']:8.1f} req/s | "
+                      f"taps p50 {result['taps_p50_ms']:7.1f} ms, p99 {result['taps_p99_ms']:7.1f} ms | "
+                      f"loop lag p99 {result['loop_lag_p99_ms']:6.1f} ms, max {result['loop_lag_max_ms']:6.1f} ms | "
+                      f"RSS {result['rss_per_session_kb']:7.1f} KiB/session | "
+                      f"errors {result['errors']}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -9,8 +9,12 @@ class Settings(BaseSettings):
 
     MIN_AVAILABLE_ENERGY: int = 100
     SLEEP_BY_MIN_ENERGY: list[int] = [1800, 2400]
+    ENERGY_AWARE_TAPS: bool = True
+    ADAPTIVE_TAPS: bool = True
+    MIN_TAPS_PER_REQUEST: int = 10
 
     ADD_TAPS_ON_TURBO: int = 2500
+    TURBO_TAP_INTERVAL: float = 1.0
 
     AUTO_UPGRADE_TAP: bool = True
     MAX_TAP_LEVEL: int = 10
@@ -27,5 +31,58 @@ class Settings(BaseSettings):
 
     USE_PROXY_FROM_FILE: bool = False
 
+    API_URL: str = "https://api.tapswap.club/api"
+
+    LOG_FILE: str = ""
+    LOG_JSON: bool = False
+    LOG_ROTATION: str = "50 MB"
+    LOG_RETENTION: int = 5
+    LOG_BUFFER_SIZE: int = 65536
+    LOG_SAMPLE_RATE: float = 1.0
+    LOG_SESSION_LEVELS: dict[str, str] = {}
+
+    METRICS_HOST: str = "127.0.0.1"
+    METRICS_PORT: int = 0
+
+    USE_SCHEDULER: bool = False
+    SCHEDULER_WORKERS: int = 50
+    SCHEDULER_MAX_RPS: float = 0
+
+    HTTP_POOL_LIMIT: int = 100
+    HTTP_POOL_LIMIT_PER_HOST: int = 0
+    DNS_CACHE_TTL: int = 300
+
+    AUTH_URL_LIFETIME: int = 86400
+
+    LOGIN_WAIT_EVENTS: bool = True
+    LOGIN_TIMEOUT: int = 60
+    MAX_PARALLEL_LOGINS: int = 2
+    BROWSER_POOL_SIZE: int = 2
+    BROWSER_IDLE_TIMEOUT: int = 900
+    BROWSER_MAX_USES: int = 20
+
+    PROXY_CHECK_URL: str = "https://httpbin.org/ip"
+    PROXY_CHECK_TIMEOUT: int = 5
+    PROXY_CHECK_CONCURRENCY: int = 20
+    PROXY_CHECK_TTL: int = 300
+    PROXY_CHECK_INTERVAL: int = 600
+    PROXY_MAX_LATENCY: float = 3.0
+    PROXY_MAX_FAILURE_RATE: float = 0.5
+    MAX_SESSIONS_PER_PROXY: int = 0
+
+    RETRY_BASE_DELAY: float = 3
+    RETRY_MAX_DELAY: float = 300
+    BREAKER_FAILURE_THRESHOLD: int = 5
+    BREAKER_RESET_TIMEOUT: float = 30
+
+    SHUTDOWN_TIMEOUT: int = 10
+
+    CLAIM_CONCURRENCY: int = 2
+    CLAIM_DELAY: list[int] = [2, 5]
+    CLAIM_MAX_ATTEMPTS: int = 5
+
+    HOT_RELOAD: bool = False
+    INVENTORY_CHECK_INTERVAL: int = 30
+
 
 settings = Settings()
@@ -0,0 +1,124 @@
+from time import time
+from array import array
+from copy import copy
+
+from bot.config import settings
+from .models import GameConf, PlayerState
+
+TURBO_DURATION = 20
+TURBO_TAP_MULTIPLIER = 5
+TURBO_BOOSTS_PER_DAY = 3
+
+
+class EnergyModel:
+    def __init__(self, conf: GameConf):
+        self.conf = conf
+
+        self.energy = 0
+        self.tap_level = 1
+        self.energy_level = 1
+        self.charge_level = 1
+        self.updated_at = 0.0
+
+    @staticmethod
+    def _level_value(values: array, level: int, default: int) -> int:
+        if 0 < level <= len(values):
+            return values[level - 1] or default
+
+        return default
+
+    @property
+    def ready(self) -> bool:
+        return self.updated_at > 0 and self.max_energy > 0 and self.regen_rate > 0
+
+    @property
+    def max_energy(self) -> int:
+        return self._level_value(self.conf.energy_limits, self.energy_level, 0)
+
+    @property
+    def regen_rate(self) -> int:
+        return self._level_value(self.conf.charge_rates, self.charge_level, 0)
+
+    @property
+    def tap_reward(self) -> int:
+        return max(self._level_value(self.conf.tap_rates, self.tap_level, 1), 1)
+
+    @property
+    def tap_cost(self) -> int:
+        return self.tap_reward
+
+    def level(self, boost_type: str) -> int:
+        return getattr(self, f'{boost_type}_level')
+
+    def price(self, boost_type: str, level: int) -> int | None:
+        prices = self.conf.prices(boost_type)
+        if 0 < level <= len(prices):
+            return prices[level - 1] or None
+
+        return None
+
+    def with_level(self, boost_type: str, level: int) -> 'EnergyModel':
+        model = copy(self)
+        setattr(model, f'{boost_type}_level', level)
+
+        return model
+
+    def coins_per_hour(self) -> float:
+        if settings.ENERGY_AWARE_TAPS is True:
+            energy_per_hour = self.regen_rate * 3600
+        else:
+            min_energy_sleep = sum(settings.SLEEP_BY_MIN_ENERGY) / 2
+            energy_per_hour = min(self.regen_rate * min_energy_sleep, self.max_energy) / min_energy_sleep * 3600
+
+        coins_per_hour = energy_per_hour / self.tap_cost * self.tap_reward
+
+        if settings.APPLY_DAILY_TURBO is True:
+            turbo_taps = settings.ADD_TAPS_ON_TURBO * TURBO_DURATION / max(settings.TURBO_TAP_INTERVAL, 1)
+            coins_per_hour += turbo_taps * TURBO_BOOSTS_PER_DAY / 24 * self.tap_reward
+
+        return coins_per_hour
+
+    def update(self, player: PlayerState) -> None:
+        self.energy = player.energy
+        self.tap_level = player.tap_level
+        self.energy_level = player.energy_level
+        self.charge_level = player.charge_level
+        self.updated_at = time()
+
+    def snapshot(self) -> dict[str]:
+        return {
+            'energy': self.energy,
+            'tap_level': self.tap_level,
+            'energy_level': self.energy_level,
+            'charge_level': self.charge_level,
+            'updated_at': self.updated_at,
+        }
+
+    def restore(self, state: dict[str]) -> None:
+        self.energy = state.get('energy', self.energy)
+        self.tap_level = state.get('tap_level', self.tap_level)
+        self.energy_level = state.get('energy_level', self.energy_level)
+        self.charge_level = state.get('charge_level', self.charge_level)
+        self.updated_at = state.get('updated_at', self.updated_at)
+
+    def refill(self) -> None:
+        self.energy = self.max_energy
+        self.updated_at = time()
+
+    def current_energy(self) -> float:
+        regenerated = self.energy + self.regen_rate * (time() - self.updated_at)
+
+        return min(regenerated, self.max_energy) if self.max_energy else regenerated
+
+    def available_taps(self) -> int:
+        return int(self.current_energy() // self.tap_cost)
+
+    def seconds_until(self, energy: float) -> float:
+        missing = min(energy, self.max_energy) - self.current_energy()
+        if missing <= 0 or self.regen_rate <= 0:
+            return 0
+
+        return missing / self.regen_rate
+
+    def seconds_until_full(self) -> float:
+        return self.seconds_until(self.max_energy)
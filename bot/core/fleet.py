@@ -0,0 +1,142 @@
+import asyncio
+from contextlib import suppress
+
+from bot.config import settings
+from bot.utils import logger
+from bot.utils.proxies import proxy_manager
+from bot.utils.stats import stats
+from .tapper import Tapper, run_tapper
+from .scheduler import Scheduler
+
+
+class Fleet:
+    def __init__(self):
+        self.tappers: dict[str, Tapper] = {}
+        self.tasks: dict[str, asyncio.Task] = {}
+        self.changed = asyncio.Event()
+        self.running = False
+        self.retiring: set[asyncio.Task] = set()
+
+        self.scheduler: Scheduler | None = None
+        self.scheduler_task: asyncio.Task | None = None
+
+    def is_running(self, session_name: str) -> bool:
+        return session_name in self.tappers
+
+    def get_state(self, session_name: str) -> str:
+        if session_name not in self.tappers:
+            return 'stopped'
+
+        return stats.get(session_name).state
+
+    def start(self, tapper: Tapper) -> bool:
+        session_name = tapper.session_name
+        if session_name in self.tappers:
+            return False
+
+        self.tappers[session_name] = tapper
+        tapper.set_proxy(proxy_manager.assign(session_name))
+
+        if settings.USE_SCHEDULER:
+            if self.scheduler is None:
+                self.scheduler = Scheduler(workers=settings.SCHEDULER_WORKERS, on_finish=self.finish)
+                self.scheduler_task = asyncio.create_task(self.scheduler.run())
+
+            self.scheduler.schedule(tapper=tapper)
+        else:
+            task = asyncio.create_task(run_tapper(tapper=tapper, proxy=tapper.proxy))
+            task.add_done_callback(lambda _: self.finish(tapper))
+            self.tasks[session_name] = task
+
+        self.changed.set()
+
+        return True
+
+    def finish(self, tapper: Tapper) -> None:
+        if tapper.stopped:
+            return
+
+        tapper.stopped = True
+
+        task = asyncio.create_task(self.retire(tapper))
+        self.retiring.add(task)
+        task.add_done_callback(self.retiring.discard)
+
+    async def retire(self, tapper: Tapper) -> None:
+        try:
+            await tapper.shutdown()
+        finally:
+            self.forget(tapper)
+
+    def forget(self, tapper: Tapper) -> None:
+        session_name = tapper.session_name
+        if self.tappers.get(session_name) is not tapper:
+            return
+
+        del self.tappers[session_name]
+        self.tasks.pop(session_name, None)
+
+        proxy_manager.release(session_name)
+        self.changed.set()
+
+    async def stop(self, session_name: str) -> bool:
+        tapper = self.tappers.get(session_name)
+        if tapper is None or tapper.stopped:
+            return False
+
+        tapper.stopped = True
+
+        task = self.tasks.get(session_name)
+        if task is None and self.scheduler:
+            task = self.scheduler.ticks.get(tapper)
+
+        if task:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+        await tapper.shutdown()
+
+        self.forget(tapper)
+        stats.set_state(session_name, 'stopped')
+
+        return True
+
+    async def stop_all(self) -> None:
+        session_names = list(self.tappers)
+
+        await asyncio.gather(*(self.stop(session_name) for session_name in session_names))
+
+        if session_names:
+            logger.info(f"Saved state of {len(session_names)} sessions")
+
+    async def close(self) -> None:
+        await self.stop_all()
+
+        if self.retiring:
+            await asyncio.gather(*self.retiring, return_exceptions=True)
+
+        if self.scheduler_task:
+            self.scheduler_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self.scheduler_task
+
+        self.scheduler = None
+        self.scheduler_task = None
+
+    def rebind_proxies(self) -> None:
+        for session_name, tapper in self.tappers.items():
+            tapper.set_proxy(proxy_manager.assign(session_name))
+
+    def move(self, session_name: str, proxy: str) -> None:
+        tapper = self.tappers.get(session_name)
+        if tapper:
+            tapper.set_proxy(proxy)
+
+    async def run(self, keep_alive: bool = False) -> None:
+        while keep_alive or self.tappers:
+            self.changed.clear()
+            await self.changed.wait()
+
+
+fleet = Fleet()
@@ -0,0 +1,110 @@
+from array import array
+
+try:
+    from orjson import loads
+except ImportError:
+    from json import loads
+
+BOOST_TYPES = ('energy', 'turbo')
+
+
+class GameConf:
+    __slots__ = ('tap_rates', 'tap_prices', 'energy_limits', 'energy_prices', 'charge_rates', 'charge_prices')
+
+    def __init__(self, conf: dict[str]):
+        self.tap_rates, self.tap_prices = self._parse_levels(conf.get('tap_levels', []), 'rate')
+        self.energy_limits, self.energy_prices = self._parse_levels(conf.get('energy_levels', []), 'limit')
+        self.charge_rates, self.charge_prices = self._parse_levels(conf.get('charge_levels', []), 'rate')
+
+    @staticmethod
+    def _parse_levels(levels: list[dict[str]], key: str) -> tuple[array, array]:
+        values = array('q', (level.get(key) or 0 for level in levels))
+        prices = array('q', (level.get('price') or 0 for level in levels))
+
+        return values, prices
+
+    @staticmethod
+    def _dump_levels(values: array, prices: array, key: str) -> list[dict[str, int]]:
+        return [{key: value, 'price': price} for value, price in zip(values, prices)]
+
+    def prices(self, boost_type: str) -> array:
+        return getattr(self, f'{boost_type}_prices')
+
+    def as_dict(self) -> dict[str]:
+        return {
+            'tap_levels': self._dump_levels(self.tap_rates, self.tap_prices, 'rate'),
+            'energy_levels': self._dump_levels(self.energy_limits, self.energy_prices, 'limit'),
+            'charge_levels': self._dump_levels(self.charge_rates, self.charge_prices, 'rate'),
+        }
+
+
+class PlayerState:
+    __slots__ = ('shares', 'energy', 'tap_level', 'energy_level', 'charge_level',
+                 'earned', 'tap_bot', 'claims', 'boosts', 'boost_ends')
+
+    def __init__(self, player: dict[str]):
+        self.shares = player.get('shares', 0)
+        self.energy = player.get('energy', 0)
+        self.tap_level = player.get('tap_level', 1)
+        self.energy_level = player.get('energy_level', 1)
+        self.charge_level = player.get('charge_level', 1)
+        self.earned = (player.get('stat') or {}).get('earned', 0)
+        self.tap_bot = bool(player.get('tap_bot'))
+        self.claims = tuple(player.get('claims') or ())
+        self.boosts, self.boost_ends = self._parse_boosts(player.get('boost') or [])
+
+    @staticmethod
+    def _parse_boosts(boosts: list[dict[str]]) -> tuple[dict[str, int], dict[str, float]]:
+        counts = {}
+        ends = {}
+        for index, boost in enumerate(boosts):
+            boost_type = boost.get('type')
+            if boost_type is None and index < len(BOOST_TYPES):
+                boost_type = BOOST_TYPES[index]
+
+            if boost_type:
+                counts[boost_type] = boost.get('cnt', 0)
+                ends[boost_type] = (boost.get('end') or 0) / 1000
+
+        return counts, ends
+
+    @property
+    def energy_boosts(self) -> int:
+        return self.boosts.get('energy', 0)
+
+    @property
+    def turbo_boosts(self) -> int:
+        return self.boosts.get('turbo', 0)
+
+    @property
+    def turbo_end(self) -> float:
+        return self.boost_ends.get('turbo', 0.0)
+
+
+class Profile:
+    __slots__ = ('access_token', 'bot_shares', 'player', 'conf')
+
+    def __init__(self, profile: dict[str]):
+        self.access_token = profile.get('access_token', '')
+        self.bot_shares = profile.get('bot_shares', 0)
+        self.player = PlayerState(profile.get('player') or {})
+        self.conf = GameConf(profile.get('conf') or {})
+
+
+def parse_player(body: bytes | str) -> PlayerState:
+    return PlayerState(loads(body)['player'])
+
+
+def parse_boost_result(body: bytes | str) -> PlayerState:
+    try:
+        result = loads(body)
+    except ValueError:
+        result = None
+
+    player = result.get('player') if isinstance(result, dict) else None
+
+    return PlayerState(player or {})
+
+
+def parse_profile(body: bytes | str) -> Profile:
+    return Profile(loads(body))
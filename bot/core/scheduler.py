@@ -0,0 +1,109 @@
+import heapq
+import asyncio
+from typing import Callable
+from itertools import count
+from time import monotonic
+from contextlib import suppress
+
+from bot.utils import logger
+from bot.utils.scripts import escape_html
+from bot.utils.stats import stats
+from bot.exceptions import InvalidSession
+from .tapper import Tapper
+
+
+class Scheduler:
+    def __init__(self, workers: int, on_finish: Callable[[Tapper], None] | None = None):
+        self.workers = workers
+        self.on_finish = on_finish
+
+        self.timers: list[tuple[float, int, Tapper]] = []
+        self.sequence = count()
+        self.changed = asyncio.Event()
+        self.ready: asyncio.Queue[Tapper] = asyncio.Queue(maxsize=workers)
+        self.ticks: dict[Tapper, asyncio.Task] = {}
+        self.detached: set[asyncio.Task] = set()
+
+    def schedule(self, tapper: Tapper, delay: float = 0) -> None:
+        due = monotonic() + delay
+        heapq.heappush(self.timers, (due, next(self.sequence), tapper))
+
+        if self.timers[0][2] is tapper:
+            self.changed.set()
+
+    async def dispatch(self) -> None:
+        while True:
+            if not self.timers:
+                self.changed.clear()
+                await self.changed.wait()
+                continue
+
+            delay = self.timers[0][0] - monotonic()
+            if delay > 0:
+                self.changed.clear()
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self.changed.wait(), timeout=delay)
+                continue
+
+            _, _, tapper = heapq.heappop(self.timers)
+
+            if tapper.next_tick_is_long():
+                self.detach(tapper=tapper)
+            else:
+                await self.ready.put(tapper)
+
+    def detach(self, tapper: Tapper) -> None:
+        task = asyncio.create_task(self.run_tick(tapper=tapper))
+        self.detached.add(task)
+        task.add_done_callback(self.detached.discard)
+
+    async def run_tick(self, tapper: Tapper) -> None:
+        if tapper.stopped:
+            return
+
+        tick = self.ticks[tapper] = asyncio.ensure_future(tapper.tick())
+        try:
+            await asyncio.wait((tick,))
+        except asyncio.CancelledError:
+            tick.cancel()
+            raise
+        finally:
+            del self.ticks[tapper]
+
+        if tick.cancelled():
+            return
+
+        try:
+            delay = tick.result()
+        except InvalidSession:
+            logger.error(f"{tapper.session_name} | Invalid Session")
+            stats.record_error(tapper.session_name, 'Invalid Session')
+            delay = None
+        except Exception as error:
+            logger.error(f"{tapper.session_name} | Unknown error: {escape_html(error)}")
+            delay = 3
+
+        if tapper.stopped:
+            return
+
+        if delay is not None:
+            tapper.set_next_wake(delay)
+            self.schedule(tapper=tapper, delay=delay)
+        elif self.on_finish:
+            self.on_finish(tapper)
+
+    async def work(self) -> None:
+        while True:
+            tapper = await self.ready.get()
+
+            await self.run_tick(tapper=tapper)
+
+    async def run(self) -> None:
+        tasks = [asyncio.create_task(self.dispatch())]
+        tasks += [asyncio.create_task(self.work()) for _ in range(self.workers)]
+
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks + list(self.detached):
+                task.cancel()
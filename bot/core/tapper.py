@@ -1,31 +1,86 @@
-import json
 import asyncio
-from time import time
-from random import randint
+from contextlib import suppress
+from time import time, monotonic
+from urllib.parse import urlparse
+from random import randint, uniform
 
 import aiohttp
-from aiocfscrape import CloudflareScraper
-from aiohttp_proxy import ProxyConnector
 from better_proxy import Proxy
 from pyrogram import Client
 from pyrogram.errors import Unauthorized, UserDeactivated, AuthKeyUnregistered, FloodWait
+from pyrogram.raw.types import InputPeerUser
 from pyrogram.raw.functions.messages import RequestWebView
 
 from bot.config import settings
 from bot.utils import logger
-from bot.utils.scripts import escape_html, login_in_browser
-from bot.exceptions import InvalidSession
+from bot.utils.scripts import escape_html, get_auth_date, login_in_executor
+from bot.utils.storage import SessionStorage
+from bot.utils.connections import connection_pool
+from bot.utils.retry import Backoff, get_breaker, acquire_breakers, request_limiter
+from bot.utils.stats import stats
+from bot.utils.metrics import TAPS, COINS, REQUEST_DURATION, ERRORS, BOOSTS, UPGRADES, SLEEP
+from bot.exceptions import InvalidSession, InvalidToken, CircuitOpen
+from .energy import EnergyModel
+from .models import GameConf, PlayerState, Profile, parse_player, parse_profile, parse_boost_result
+from .upgrades import plan_upgrades
+from .taps import TapController
+from .turbo import TurboBurst
 from .headers import headers
 
+TOKEN_LIFETIME = 1800
+
 
 class Tapper:
-    def __init__(self, tg_client: Client, lock: asyncio.Lock):
+    def __init__(self, tg_client: Client):
         self.session_name = tg_client.name
         self.tg_client = tg_client
         self.user_id = 0
-        self.lock = lock
+        self.storage = SessionStorage(session_name=self.session_name)
+        self.logger = logger.bind(session_name=self.session_name)
+
+        self.proxy = None
+        self.proxy_changed = False
+        self.ready = False
+        self.stopped = False
+        self.http_client = None
+        self.auth_url = None
+
+        self.access_token_created_time = 0
+
+        self.balance = None
+        self.energy_model = None
+        self.tap_controller = TapController()
+
+        self.next_wake = 0.0
+        self.resume_delay = 0.0
+        self.pending_taps = None
+        self.turbo_burst = None
+
+        self.claims: dict[str, int] = {}
+        self.claim_task = None
+        self.claim_backoff = Backoff(base=settings.RETRY_BASE_DELAY, cap=settings.RETRY_MAX_DELAY)
+
+        self.backoff = Backoff(base=settings.RETRY_BASE_DELAY, cap=settings.RETRY_MAX_DELAY)
+
+    def get_cached_auth_url(self) -> str | None:
+        cache = self.storage.get('telegram')
+        if not cache or not cache.get('auth_url'):
+            return None
+
+        if time() - get_auth_date(cache['auth_url']) >= settings.AUTH_URL_LIFETIME:
+            return None
+
+        self.user_id = cache['user_id']
+
+        return cache['auth_url']
 
     async def get_auth_url(self, proxy: str | None) -> str:
+        auth_url = self.get_cached_auth_url()
+        if auth_url:
+            return auth_url
+
+        cache = self.storage.get('telegram') or {}
+
         if proxy:
             proxy = Proxy.from_str(proxy)
             proxy_dict = dict(
@@ -40,6 +95,8 @@ class Tapper:
 
         self.tg_client.proxy = proxy_dict
 
+        started_at = monotonic()
+
         try:
             with_tg = True
 
@@ -50,17 +107,20 @@ class Tapper:
                 except (Unauthorized, UserDeactivated, AuthKeyUnregistered):
                     raise InvalidSession(self.session_name)
 
-            while True:
-                try:
-                    peer = await self.tg_client.resolve_peer('tapswap_bot')
-                    break
-                except FloodWait as fl:
-                    fls = fl.value
+            if cache.get('peer'):
+                peer = InputPeerUser(user_id=cache['peer']['user_id'], access_hash=cache['peer']['access_hash'])
+            else:
+                while True:
+                    try:
+                        peer = await self.tg_client.resolve_peer('tapswap_bot')
+                        break
+                    except FloodWait as fl:
+                        fls = fl.value
 
-                    logger.warning(f"{self.session_name} | FloodWait {fl}")
-                    logger.info(f"{self.session_name} | Sleep {fls}s")
+                        self.logger.warning(f"{self.session_name} | FloodWait {fl}")
+                        self.logger.info(f"{self.session_name} | Sleep {fls}s")
 
-                    await asyncio.sleep(fls + 3)
+                        await asyncio.sleep(fls + 3)
 
             web_view = await self.tg_client.invoke(RequestWebView(
                 peer=peer,
@@ -72,92 +132,225 @@ class Tapper:
 
             auth_url = web_view.url.replace('tgWebAppVersion=6.7', 'tgWebAppVersion=7.2')
 
-            self.user_id = (await self.tg_client.get_me()).id
+            self.user_id = cache.get('user_id') or (await self.tg_client.get_me()).id
 
             if with_tg is False:
                 await self.tg_client.disconnect()
 
+            self.storage.set('telegram', {
+                'peer': {'user_id': peer.user_id, 'access_hash': peer.access_hash},
+                'user_id': self.user_id,
+                'auth_url': auth_url,
+            })
+
+            REQUEST_DURATION.observe(monotonic() - started_at, endpoint='get_auth_url')
+
             return auth_url
 
         except InvalidSession as error:
             raise error
 
         except Exception as error:
-            logger.error(f"{self.session_name} | Unknown error during Authorization: {escape_html(error)}")
+            self.logger.error(f"{self.session_name} | Unknown error during Authorization: {escape_html(error)}")
+            ERRORS.inc(endpoint='get_auth_url', session=self.session_name)
+            self.storage.delete('telegram')
             await asyncio.sleep(delay=3)
 
-    async def login(self, http_client: aiohttp.ClientSession, auth_url: str, proxy: str) -> tuple[dict[str], str]:
+    async def login(self, http_client: aiohttp.ClientSession, auth_url: str, proxy: str) -> tuple[Profile | None, str]:
         response_text = ''
+        started_at = monotonic()
         try:
-            async with self.lock:
-                response_text, x_cv, x_touch = login_in_browser(auth_url, proxy=proxy)
+            response_text, x_cv, x_touch = await login_in_executor(auth_url, proxy=proxy)
+            REQUEST_DURATION.observe(monotonic() - started_at, endpoint='login')
 
-            response_json = json.loads(response_text)
-            access_token = response_json.get('access_token', '')
-            profile_data = response_json
+            profile = parse_profile(response_text)
+            access_token = profile.access_token
 
             if headers:
                 http_client.headers['X-Cv'] = x_cv
                 http_client.headers['X-Touch'] = x_touch
 
-            return profile_data, access_token
+            if access_token:
+                self.storage.set('token', {
+                    'access_token': access_token,
+                    'x_cv': x_cv,
+                    'x_touch': x_touch,
+                    'conf': profile.conf.as_dict(),
+                    'created': time(),
+                })
+
+            return profile, access_token
         except Exception as error:
-            logger.error(f"{self.session_name} | Unknown error while Login: {escape_html(error)} | "
-                         f"Response text: {escape_html(response_text)}...")
-            await asyncio.sleep(delay=3)
+            self.logger.error(f"{self.session_name} | Unknown error while Login: {escape_html(error)} | "
+                              f"Response text: {escape_html(response_text)}...")
+            ERRORS.inc(endpoint='login', session=self.session_name)
 
-            return {}, ''
+            return None, ''
 
-    async def apply_boost(self, http_client: aiohttp.ClientSession, boost_type: str) -> bool:
-        response_text = ''
+    def load_token(self, http_client: aiohttp.ClientSession) -> dict[str] | None:
+        token = self.storage.get('token')
+        if not token or time() - token['created'] >= TOKEN_LIFETIME:
+            return None
+
+        http_client.headers["Authorization"] = f"Bearer {token['access_token']}"
+        http_client.headers['X-Cv'] = token['x_cv']
+        http_client.headers['X-Touch'] = token['x_touch']
+
+        return token
+
+    async def request(self, http_client: aiohttp.ClientSession, path: str, json_data: dict[str]) -> bytes:
+        endpoint = path.rsplit('/', 1)[-1]
+        host_breaker = get_breaker(urlparse(settings.API_URL).netloc)
+        proxy_breaker = get_breaker(urlparse(self.proxy).netloc.rpartition('@')[2]) if self.proxy else None
+        circuits = [breaker for breaker in (proxy_breaker, host_breaker) if breaker]
+
+        await request_limiter.acquire()
+        acquire_breakers(*circuits)
+
+        started_at = monotonic()
         try:
-            response = await http_client.post(url='https://api.tapswap.club/api/player/apply_boost',
-                                              json={'type': boost_type})
-            response_text = await response.text()
-            response.raise_for_status()
+            response = await http_client.post(url=f'{settings.API_URL}/{path}', json=json_data)
+            response_body = await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            failed = proxy_breaker or host_breaker
+            failed.record_failure()
+            for breaker in circuits:
+                if breaker is not failed:
+                    breaker.release()
+            raise
+        except BaseException:
+            for breaker in circuits:
+                breaker.release()
+            raise
+
+        REQUEST_DURATION.observe(monotonic() - started_at, endpoint=endpoint)
+        stats.record_latency(monotonic() - started_at)
+
+        if proxy_breaker:
+            proxy_breaker.record_success()
+
+        if response.status >= 500:
+            host_breaker.record_failure()
+        else:
+            host_breaker.record_success()
 
-            return True
-        except Exception as error:
-            logger.error(f"{self.session_name} | Unknown error when Apply {boost_type} Boost: {escape_html(error)} | "
-                         f"Response text: {escape_html(response_text)[:128]}...")
-            await asyncio.sleep(delay=3)
+        if response.status == 401:
+            raise InvalidToken(self.session_name)
 
-            return False
+        if response.status >= 400:
+            raise aiohttp.ClientResponseError(response.request_info, response.history,
+                                              status=response.status, headers=response.headers,
+                                              message=response_body[:128].decode('utf-8', errors='replace')
+                                              or response.reason)
+
+        return response_body
+
+    async def apply_boost(self, http_client: aiohttp.ClientSession, boost_type: str) -> PlayerState:
+        try:
+            response_body = await self.request(http_client=http_client, path='player/apply_boost',
+                                               json_data={'type': boost_type})
+
+            BOOSTS.inc(session=self.session_name, type=boost_type)
+
+            return parse_boost_result(response_body)
+        except (InvalidToken, CircuitOpen) as error:
+            raise error
+        except Exception as error:
+            self.logger.error(f"{self.session_name} | Unknown error when Apply {boost_type} Boost: {escape_html(error)}")
+            ERRORS.inc(endpoint='apply_boost', session=self.session_name)
+            raise error
 
     async def upgrade_boost(self, http_client: aiohttp.ClientSession, boost_type: str) -> bool:
-        response_text = ''
         try:
-            response = await http_client.post(url='https://api.tapswap.club/api/player/upgrade',
-                                              json={'type': boost_type})
-            response_text = await response.text()
-            response.raise_for_status()
+            await self.request(http_client=http_client, path='player/upgrade', json_data={'type': boost_type})
+
+            UPGRADES.inc(session=self.session_name, type=boost_type)
 
             return True
+        except (InvalidToken, CircuitOpen) as error:
+            raise error
         except Exception as error:
-            logger.error(f"{self.session_name} | Unknown error when Upgrade {boost_type} Boost: {escape_html(error)} | "
-                         f"Response text: {escape_html(response_text)[:128]}...")
-            await asyncio.sleep(delay=3)
+            self.logger.error(f"{self.session_name} | Unknown error when Upgrade {boost_type} Boost: {escape_html(error)}")
+            ERRORS.inc(endpoint='upgrade', session=self.session_name)
+            raise error
 
-            return False
+    async def apply_upgrades(self, http_client: aiohttp.ClientSession, upgrades: list[tuple[str, int, int]]) -> None:
+        plan = ', '.join(f"{boost_type} to {level} lvl" for boost_type, level, _ in upgrades)
+        self.logger.info(f"{self.session_name} | Upgrade plan: {plan}")
+
+        for boost_type, level, price in upgrades:
+            await self.upgrade_boost(http_client=http_client, boost_type=boost_type)
+
+            if self.balance is not None:
+                self.balance -= price
+
+            self.logger.success(f"{self.session_name} | {boost_type.capitalize()} upgraded to {level} lvl "
+                                f"(<r>-{price:,}</r>)")
+
+            await asyncio.sleep(delay=1)
 
     async def claim_reward(self, http_client: aiohttp.ClientSession, task_id: str) -> bool:
-        response_text = ''
         try:
-            response = await http_client.post(url='https://api.tapswap.club/api/player/claim_reward',
-                                              json={'task_id': task_id})
-            response_text = await response.text()
-            response.raise_for_status()
+            await self.request(http_client=http_client, path='player/claim_reward', json_data={'task_id': task_id})
 
             return True
+        except (InvalidToken, CircuitOpen) as error:
+            raise error
         except Exception as error:
-            logger.error(f"{self.session_name} | Unknown error when Claim {task_id} Reward: {escape_html(error)} | "
-                         f"Response text: {escape_html(response_text)[:128]}...")
-            await asyncio.sleep(delay=3)
+            self.logger.error(f"{self.session_name} | Unknown error when Claim {task_id} Reward: {escape_html(error)}")
+            ERRORS.inc(endpoint='claim_reward', session=self.session_name)
+            raise error
 
-            return False
+    def queue_claims(self, task_ids: list[str]) -> None:
+        for task_id in task_ids:
+            self.claims.setdefault(task_id, 0)
 
-    async def send_taps(self, http_client: aiohttp.ClientSession, taps: int) -> dict[str]:
-        response_text = ''
+        if self.claims and (self.claim_task is None or self.claim_task.done()):
+            self.claim_task = asyncio.create_task(self.process_claims())
+
+    async def claim_one(self, task_id: str, semaphore: asyncio.Semaphore) -> bool:
+        async with semaphore:
+            await asyncio.sleep(delay=uniform(settings.CLAIM_DELAY[0], settings.CLAIM_DELAY[1]))
+
+            try:
+                await self.claim_reward(http_client=self.http_client, task_id=task_id)
+            except (InvalidToken, CircuitOpen):
+                return False
+            except Exception:
+                self.claims[task_id] += 1
+                if self.claims[task_id] >= settings.CLAIM_MAX_ATTEMPTS:
+                    self.logger.warning(f"{self.session_name} | Giving up on <m>{task_id}</m> reward "
+                                        f"after {self.claims[task_id]} attempts")
+                    del self.claims[task_id]
+
+                return False
+
+            del self.claims[task_id]
+            self.logger.success(f"{self.session_name} | Successfully claim <m>{task_id}</m> reward")
+
+            return True
+
+    async def process_claims(self) -> None:
+        semaphore = asyncio.Semaphore(settings.CLAIM_CONCURRENCY)
+
+        while self.claims and not self.stopped:
+            self.logger.info(f"{self.session_name} | Claiming {len(self.claims)} rewards in the background")
+
+            results = await asyncio.gather(*(self.claim_one(task_id=task_id, semaphore=semaphore)
+                                             for task_id in list(self.claims)))
+
+            if not self.claims:
+                self.claim_backoff.reset()
+                return
+
+            if all(results):
+                continue
+
+            delay = self.claim_backoff.next_delay()
+            self.logger.info(f"{self.session_name} | {len(self.claims)} rewards left to claim, retry in {delay:.0f}s")
+            await asyncio.sleep(delay=delay)
+
+    async def send_taps(self, http_client: aiohttp.ClientSession, taps: int) -> PlayerState:
         try:
             timestamp = int(time() * 1000)
             content_id = int((timestamp * self.user_id * self.user_id / self.user_id) % self.user_id % self.user_id)
@@ -166,230 +359,303 @@ class Tapper:
 
             http_client.headers['Content-Id'] = str(content_id)
 
-            response = await http_client.post(url='https://api.tapswap.club/api/player/submit_taps', json=json_data)
-            response_text = await response.text()
-            response.raise_for_status()
-
-            response_json = await response.json()
-            player_data = response_json['player']
+            response_body = await self.request(http_client=http_client, path='player/submit_taps', json_data=json_data)
 
-            return player_data
+            return parse_player(response_body)
+        except (InvalidToken, CircuitOpen) as error:
+            raise error
         except Exception as error:
-            logger.error(f"{self.session_name} | Unknown error when Tapping: {escape_html(error)} | "
-                         f"Response text: {escape_html(response_text)[:128]}...")
-            await asyncio.sleep(delay=3)
+            self.logger.error(f"{self.session_name} | Unknown error when Tapping: {escape_html(error)}")
+            ERRORS.inc(endpoint='send_taps', session=self.session_name)
+            raise error
 
-    async def check_proxy(self, http_client: aiohttp.ClientSession, proxy: Proxy) -> None:
-        try:
-            response = await http_client.get(url='https://httpbin.org/ip', timeout=aiohttp.ClientTimeout(5))
-            ip = (await response.json()).get('origin')
-            logger.info(f"{self.session_name} | Proxy IP: {ip}")
-        except Exception as error:
-            logger.error(f"{self.session_name} | Proxy: {proxy} | Error: {escape_html(error)}")
+    def set_proxy(self, proxy: str | None) -> None:
+        if proxy != self.proxy:
+            self.proxy = proxy
+            self.proxy_changed = True
 
-    async def run(self, proxy: str | None) -> None:
-        access_token_created_time = 0
-        turbo_time = 0
-        active_turbo = False
+    async def setup(self) -> bool:
+        self.http_client = connection_pool.create_session(proxy=self.proxy, headers=headers)
+        self.proxy_changed = False
 
-        proxy_conn = ProxyConnector().from_url(proxy) if proxy else None
+        self.auth_url = await self.get_auth_url(proxy=self.proxy)
 
-        http_client = CloudflareScraper(headers=headers, connector=proxy_conn)
+        if not self.auth_url:
+            return False
 
-        if proxy:
-            await self.check_proxy(http_client=http_client, proxy=proxy)
+        token = self.load_token(http_client=self.http_client)
+        if token:
+            self.access_token_created_time = token['created']
+            self.energy_model = EnergyModel(conf=GameConf(token['conf']))
 
-        auth_url = await self.get_auth_url(proxy=proxy)
+            self.logger.info(f"{self.session_name} | Access token restored from cache")
 
-        if not auth_url:
-            return
+        checkpoint = self.storage.get('checkpoint')
+        if checkpoint:
+            self.storage.delete('checkpoint')
 
-        while True:
-            try:
-                if http_client.closed:
-                    if proxy_conn:
-                        if not proxy_conn.closed:
-                            proxy_conn.close()
+            self.balance = checkpoint.get('balance')
+            self.resume_delay = max(checkpoint.get('next_wake', 0) - time(), 0)
+            if self.energy_model and checkpoint.get('energy'):
+                self.energy_model.restore(state=checkpoint['energy'])
+
+            self.claims.update(checkpoint.get('claims') or {})
+
+        if token:
+            self.queue_claims(task_ids=[])
+
+        self.ready = True
+
+        return True
+
+    def next_tick_is_long(self) -> bool:
+        return (not self.ready or self.turbo_burst is not None
+                or time() - self.access_token_created_time >= TOKEN_LIFETIME)
+
+    async def tick(self) -> float | None:
+        if not self.ready:
+            if not await self.setup():
+                stats.set_state(self.session_name, 'stopped')
+                return None
+
+        stats.set_state(self.session_name, 'active')
 
-                    proxy_conn = ProxyConnector().from_url(proxy) if proxy else None
-                    http_client = aiohttp.ClientSession(headers=headers, connector=proxy_conn)
+        if self.resume_delay > 0:
+            resume_delay, self.resume_delay = self.resume_delay, 0.0
 
-                if time() - access_token_created_time >= 1800:
-                    profile_data, access_token = await self.login(http_client=http_client,
-                                                                  auth_url=auth_url,
-                                                                  proxy=proxy)
+            self.logger.info(f"{self.session_name} | Resuming schedule, sleep {resume_delay:,.0f}s")
 
-                    if not access_token:
-                        continue
+            return resume_delay
 
-                    http_client.headers["Authorization"] = f"Bearer {access_token}"
+        http_client = self.http_client
 
-                    access_token_created_time = time()
+        if self.proxy_changed:
+            self.proxy_changed = False
+            await http_client.close()
 
-                    tap_bot = profile_data['player']['tap_bot']
-                    if tap_bot:
-                        bot_earned = profile_data['bot_shares']
+            self.logger.info(f"{self.session_name} | Switched to proxy {self.proxy}")
 
-                        logger.success(f"{self.session_name} | Tap bot earned +{bot_earned:,} coins!")
+        try:
+            if http_client.closed:
+                http_client = self.http_client = connection_pool.create_session(proxy=self.proxy, headers=headers)
+                if not self.load_token(http_client=http_client):
+                    self.access_token_created_time = 0
+
+            if self.turbo_burst is not None:
+                turbo_burst, self.turbo_burst = self.turbo_burst, None
+                await turbo_burst.run(http_client=http_client)
+
+                return 0
+
+            if time() - self.access_token_created_time >= TOKEN_LIFETIME:
+                stats.set_state(self.session_name, 'login')
+
+                if not self.get_cached_auth_url():
+                    self.auth_url = await self.get_auth_url(proxy=self.proxy) or self.auth_url
+
+                profile, access_token = await self.login(http_client=http_client,
+                                                         auth_url=self.auth_url,
+                                                         proxy=self.proxy)
+
+                if not access_token:
+                    stats.record_error(self.session_name, 'Login failed')
+                    return self.backoff.next_delay()
+
+                stats.set_state(self.session_name, 'active')
 
-                    balance = profile_data['player']['shares']
+                http_client.headers["Authorization"] = f"Bearer {access_token}"
 
-                    tap_prices = {index + 1: data['price'] for index, data in
-                                  enumerate(profile_data['conf']['tap_levels'])}
-                    energy_prices = {index + 1: data['price'] for index, data in
-                                     enumerate(profile_data['conf']['energy_levels'])}
-                    charge_prices = {index + 1: data['price'] for index, data in
-                                     enumerate(profile_data['conf']['charge_levels'])}
+                self.access_token_created_time = time()
 
-                    claims = profile_data['player']['claims']
-                    if claims:
-                        for task_id in claims:
-                            logger.info(f"{self.session_name} | Sleep 5s before claim <m>{task_id}</m> reward")
-                            await asyncio.sleep(delay=5)
+                if profile.player.tap_bot:
+                    bot_earned = profile.bot_shares
 
-                            status = await self.claim_reward(http_client=http_client, task_id=task_id)
-                            if status is True:
-                                logger.success(f"{self.session_name} | Successfully claim <m>{task_id}</m> reward")
+                    self.logger.success(f"{self.session_name} | Tap bot earned +{bot_earned:,} coins!")
 
-                                await asyncio.sleep(delay=1)
+                self.balance = profile.player.shares
 
+                self.energy_model = EnergyModel(conf=profile.conf)
+                self.energy_model.update(player=profile.player)
+
+                self.queue_claims(task_ids=profile.player.claims)
+
+            energy_model = self.energy_model
+
+            if settings.ADAPTIVE_TAPS is True:
+                taps = self.tap_controller.next_batch(energy_model=energy_model)
+
+                if taps == 0:
+                    wait = int(self.tap_controller.seconds_until_batch(energy_model=energy_model)) + randint(1, 5)
+                    self.logger.bind(routine=True).info(f"{self.session_name} | Not enough energy for "
+                                                        f"{settings.MIN_TAPS_PER_REQUEST} taps, sleep {wait}s")
+
+                    return wait
+            elif settings.ENERGY_AWARE_TAPS is True and energy_model and energy_model.ready:
+                taps = max(energy_model.available_taps(), 1)
+            else:
                 taps = randint(a=settings.RANDOM_TAPS_COUNT[0], b=settings.RANDOM_TAPS_COUNT[1])
 
-                if active_turbo:
-                    taps += settings.ADD_TAPS_ON_TURBO
-                    if time() - turbo_time > 20:
-                        active_turbo = False
-                        turbo_time = 0
+            requested_taps = taps
 
-                player_data = await self.send_taps(http_client=http_client, taps=taps)
+            self.pending_taps = asyncio.ensure_future(self.send_taps(http_client=http_client, taps=taps))
+            player = await asyncio.shield(self.pending_taps)
+            self.pending_taps = None
+            self.backoff.reset()
 
-                if not player_data:
-                    continue
+            available_energy = player.energy
+            energy_model.update(player=player)
+            new_balance = player.shares
+            calc_taps = abs(new_balance - self.balance) if self.balance is not None else 0
+            if self.balance is not None:
+                self.tap_controller.update(requested=requested_taps, credited_coins=new_balance - self.balance,
+                                           tap_reward=energy_model.tap_reward)
+            balance = self.balance = new_balance
+            total = player.earned
 
-                available_energy = player_data['energy']
-                new_balance = player_data['shares']
-                calc_taps = abs(new_balance - balance)
-                balance = new_balance
-                total = player_data['stat']['earned']
+            TAPS.inc(taps, session=self.session_name)
+            COINS.inc(calc_taps, session=self.session_name)
+            stats.record_taps(self.session_name, taps=taps, coins=calc_taps, balance=balance)
 
-                turbo_boost_count = player_data['boost'][1]['cnt']
-                energy_boost_count = player_data['boost'][0]['cnt']
+            turbo_boost_count = player.turbo_boosts
+            energy_boost_count = player.energy_boosts
 
-                next_tap_level = player_data['tap_level'] + 1
-                next_energy_level = player_data['energy_level'] + 1
-                next_charge_level = player_data['charge_level'] + 1
+            self.logger.bind(routine=True).success(f"{self.session_name} | Successful tapped! | "
+                                                   f"Balance: <c>{balance:,}</c> (<g>+{calc_taps:,}</g>) | Total: <e>{total:,}</e>")
 
-                logger.success(f"{self.session_name} | Successful tapped! | "
-                               f"Balance: <c>{balance:,}</c> (<g>+{calc_taps:,}</g>) | Total: <e>{total:,}</e>")
+            if (energy_boost_count > 0
+                    and available_energy < settings.MIN_AVAILABLE_ENERGY
+                    and settings.APPLY_DAILY_ENERGY is True):
+                self.logger.info(f"{self.session_name} | Sleep 5s before activating the daily energy boost")
+                await asyncio.sleep(delay=5)
 
-                if active_turbo is False:
-                    if (energy_boost_count > 0
-                            and available_energy < settings.MIN_AVAILABLE_ENERGY
-                            and settings.APPLY_DAILY_ENERGY is True):
-                        logger.info(f"{self.session_name} | Sleep 5s before activating the daily energy boost")
-                        await asyncio.sleep(delay=5)
+                await self.apply_boost(http_client=http_client, boost_type="energy")
+                self.logger.success(f"{self.session_name} | Energy boost applied")
+                energy_model.refill()
 
-                        status = await self.apply_boost(http_client=http_client, boost_type="energy")
-                        if status is True:
-                            logger.success(f"{self.session_name} | Energy boost applied")
+                await asyncio.sleep(delay=1)
 
-                            await asyncio.sleep(delay=1)
+                return 0
 
-                        continue
+            if turbo_boost_count > 0 and settings.APPLY_DAILY_TURBO is True:
+                self.logger.info(f"{self.session_name} | Sleep 5s before activating the daily turbo boost")
+                await asyncio.sleep(delay=5)
 
-                    if turbo_boost_count > 0 and settings.APPLY_DAILY_TURBO is True:
-                        logger.info(f"{self.session_name} | Sleep 5s before activating the daily turbo boost")
-                        await asyncio.sleep(delay=5)
+                boost = await self.apply_boost(http_client=http_client, boost_type="turbo")
+                self.logger.success(f"{self.session_name} | Turbo boost applied")
 
-                        status = await self.apply_boost(http_client=http_client, boost_type="turbo")
-                        if status is True:
-                            logger.success(f"{self.session_name} | Turbo boost applied")
+                self.turbo_burst = TurboBurst(tapper=self, turbo_end=boost.turbo_end)
 
-                            await asyncio.sleep(delay=1)
+                return 0
 
-                            active_turbo = True
-                            turbo_time = time()
+            upgrades = plan_upgrades(energy_model=energy_model, balance=balance)
+            if upgrades:
+                await self.apply_upgrades(http_client=http_client, upgrades=upgrades)
 
-                        continue
+                return 0
 
-                    if (settings.AUTO_UPGRADE_TAP is True
-                            and balance > tap_prices.get(next_tap_level, 0)
-                            and next_tap_level <= settings.MAX_TAP_LEVEL):
-                        logger.info(f"{self.session_name} | Sleep 5s before upgrade tap to {next_tap_level} lvl")
-                        await asyncio.sleep(delay=5)
+            if available_energy < settings.MIN_AVAILABLE_ENERGY:
+                if settings.ENERGY_AWARE_TAPS is True and energy_model.ready:
+                    random_sleep = int(energy_model.seconds_until_full()) + randint(1, 30)
+                else:
+                    random_sleep = randint(settings.SLEEP_BY_MIN_ENERGY[0], settings.SLEEP_BY_MIN_ENERGY[1])
 
-                        status = await self.upgrade_boost(http_client=http_client, boost_type="tap")
-                        if status is True:
-                            logger.success(f"{self.session_name} | Tap upgraded to {next_tap_level} lvl")
+                self.logger.info(f"{self.session_name} | Minimum energy reached: {available_energy}")
+                self.logger.info(f"{self.session_name} | Sleep {random_sleep:,}s")
 
-                            await asyncio.sleep(delay=1)
+                return random_sleep
 
-                        continue
+        except InvalidSession as error:
+            raise error
+
+        except InvalidToken:
+            self.logger.warning(f"{self.session_name} | Access token rejected, login again")
 
-                    if (settings.AUTO_UPGRADE_ENERGY is True
-                            and balance > energy_prices.get(next_energy_level, 0)
-                            and next_energy_level <= settings.MAX_ENERGY_LEVEL):
-                        logger.info(
-                            f"{self.session_name} | Sleep 5s before upgrade energy to {next_energy_level} lvl")
-                        await asyncio.sleep(delay=5)
+            self.storage.delete('token')
+            self.access_token_created_time = 0
 
-                        status = await self.upgrade_boost(http_client=http_client, boost_type="energy")
-                        if status is True:
-                            logger.success(f"{self.session_name} | Energy upgraded to {next_energy_level} lvl")
+            return 0
 
-                            await asyncio.sleep(delay=1)
+        except CircuitOpen as error:
+            stats.set_state(self.session_name, 'parked')
+            self.logger.bind(routine=True).info(f"{self.session_name} | Requests via {error.key} are parked, "
+                                                f"sleep {error.delay:.0f}s")
 
-                        continue
+            return error.delay
 
-                    if (settings.AUTO_UPGRADE_CHARGE is True
-                            and balance > charge_prices.get(next_charge_level, 0)
-                            and next_charge_level <= settings.MAX_CHARGE_LEVEL):
-                        logger.info(
-                            f"{self.session_name} | Sleep 5s before upgrade charge to {next_charge_level} lvl")
-                        await asyncio.sleep(delay=5)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            stats.record_error(self.session_name, str(error))
+            delay = self.backoff.delay_for(error)
+            self.logger.info(f"{self.session_name} | Retry in {delay:.0f}s")
 
-                        status = await self.upgrade_boost(http_client=http_client, boost_type="charge")
-                        if status is True:
-                            logger.success(f"{self.session_name} | Charge upgraded to {next_charge_level} lvl")
+            return delay
 
-                            await asyncio.sleep(delay=1)
+        except Exception as error:
+            self.logger.error(f"{self.session_name} | Unknown error: {escape_html(error)}")
+            stats.record_error(self.session_name, str(error))
 
-                        continue
+            return self.backoff.delay_for(error)
 
-                    if available_energy < settings.MIN_AVAILABLE_ENERGY:
-                        await http_client.close()
-                        if proxy_conn:
-                            if not proxy_conn.closed:
-                                proxy_conn.close()
+        sleep_between_clicks = randint(a=settings.SLEEP_BETWEEN_TAP[0], b=settings.SLEEP_BETWEEN_TAP[1])
 
-                        random_sleep = randint(settings.SLEEP_BY_MIN_ENERGY[0], settings.SLEEP_BY_MIN_ENERGY[1])
+        self.logger.bind(routine=True).info(f"{self.session_name} | Sleep {sleep_between_clicks}s")
 
-                        logger.info(f"{self.session_name} | Minimum energy reached: {available_energy}")
-                        logger.info(f"{self.session_name} | Sleep {random_sleep:,}s")
+        return sleep_between_clicks
 
-                        await asyncio.sleep(delay=random_sleep)
+    def set_next_wake(self, delay: float) -> None:
+        self.next_wake = time() + delay
 
-                        access_token_created_time = 0
+        SLEEP.inc(delay, session=self.session_name)
+        stats.set_sleeping(self.session_name)
 
-            except InvalidSession as error:
-                raise error
+    def checkpoint(self) -> None:
+        state = {'next_wake': self.next_wake, 'balance': self.balance, 'claims': self.claims}
+        if self.energy_model and self.energy_model.ready:
+            state['energy'] = self.energy_model.snapshot()
 
-            except Exception as error:
-                logger.error(f"{self.session_name} | Unknown error: {escape_html(error)}")
-                await asyncio.sleep(delay=3)
+        self.storage.set('checkpoint', state)
 
-            else:
-                sleep_between_clicks = randint(a=settings.SLEEP_BETWEEN_TAP[0], b=settings.SLEEP_BETWEEN_TAP[1])
+    async def shutdown(self) -> None:
+        if self.claim_task is not None:
+            self.claim_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self.claim_task
+
+            self.claim_task = None
+
+        if self.pending_taps is not None:
+            try:
+                player = await asyncio.wait_for(self.pending_taps, timeout=settings.SHUTDOWN_TIMEOUT)
+                self.balance = player.shares
+                if self.energy_model:
+                    self.energy_model.update(player=player)
+            except (Exception, asyncio.CancelledError):
+                ...
+
+            self.pending_taps = None
+
+        if self.ready:
+            self.checkpoint()
+
+        if self.http_client and not self.http_client.closed:
+            await self.http_client.close()
+
+    async def run(self, proxy: str | None) -> None:
+        self.set_proxy(proxy)
+
+        while True:
+            delay = await self.tick()
 
-                if active_turbo is True:
-                    sleep_between_clicks = 4
+            if delay is None:
+                return
 
-                logger.info(f"Sleep {sleep_between_clicks}s")
-                await asyncio.sleep(delay=sleep_between_clicks)
+            if delay:
+                self.set_next_wake(delay)
+                await asyncio.sleep(delay=delay)
 
 
-async def run_tapper(tg_client: Client, proxy: str | None, lock: asyncio.Lock):
+async def run_tapper(tapper: Tapper, proxy: str | None):
     try:
-        await Tapper(tg_client=tg_client, lock=lock).run(proxy=proxy)
+        await tapper.run(proxy=proxy)
     except InvalidSession:
-        logger.error(f"{tg_client.name} | Invalid Session")
+        logger.error(f"{tapper.session_name} | Invalid Session")
+        stats.record_error(tapper.session_name, 'Invalid Session')
@@ -0,0 +1,53 @@
+from random import randint
+
+from bot.config import settings
+from .energy import EnergyModel
+
+EFFICIENCY_SMOOTHING = 0.3
+SHRINK_BELOW = 0.9
+GROWTH_FACTOR = 1.5
+
+
+class TapController:
+    def __init__(self):
+        self.limit: int | None = None
+        self.efficiency = 1.0
+
+    @staticmethod
+    def random_batch() -> int:
+        return randint(a=settings.RANDOM_TAPS_COUNT[0], b=settings.RANDOM_TAPS_COUNT[1])
+
+    def next_batch(self, energy_model: EnergyModel | None) -> int:
+        if not energy_model or not energy_model.ready:
+            return self.random_batch()
+
+        available_taps = energy_model.available_taps()
+
+        if settings.ENERGY_AWARE_TAPS is True:
+            taps = available_taps
+        else:
+            taps = min(self.random_batch(), available_taps)
+
+        if self.limit is not None:
+            taps = min(taps, self.limit)
+
+        if taps < settings.MIN_TAPS_PER_REQUEST:
+            return 0
+
+        return taps
+
+    def seconds_until_batch(self, energy_model: EnergyModel) -> float:
+        return energy_model.seconds_until(settings.MIN_TAPS_PER_REQUEST * energy_model.tap_cost)
+
+    def update(self, requested: int, credited_coins: int, tap_reward: int) -> None:
+        if requested <= 0 or credited_coins < 0:
+            return
+
+        credited_taps = credited_coins / max(tap_reward, 1)
+        efficiency = min(credited_taps / requested, 1.0)
+        self.efficiency += (efficiency - self.efficiency) * EFFICIENCY_SMOOTHING
+
+        if efficiency < SHRINK_BELOW:
+            self.limit = max(int(credited_taps), settings.MIN_TAPS_PER_REQUEST)
+        elif self.limit is not None and requested >= self.limit:
+            self.limit = int(self.limit * GROWTH_FACTOR) + 1
@@ -0,0 +1,110 @@
+import asyncio
+from time import time, monotonic
+from typing import TYPE_CHECKING
+
+import aiohttp
+
+from bot.config import settings
+from bot.utils.retry import get_retry_after
+from bot.utils.stats import stats
+from bot.utils.metrics import TAPS, COINS, TURBO_TAPS
+from bot.exceptions import InvalidToken, CircuitOpen
+from .energy import TURBO_DURATION, TURBO_TAP_MULTIPLIER
+from .models import PlayerState
+
+if TYPE_CHECKING:
+    from .tapper import Tapper
+
+TURBO_END_MARGIN = 0.3
+
+
+def get_turbo_deadline(turbo_end: float, started_at: float) -> float:
+    remaining = turbo_end - time() if turbo_end else 0
+    if remaining <= 0:
+        remaining = TURBO_DURATION
+
+    return started_at + min(remaining, TURBO_DURATION) - TURBO_END_MARGIN
+
+
+class TurboBurst:
+    def __init__(self, tapper: 'Tapper', turbo_end: float):
+        self.tapper = tapper
+        self.started_at = monotonic()
+        self.deadline = get_turbo_deadline(turbo_end, started_at=self.started_at)
+
+        if turbo_end and turbo_end <= time():
+            tapper.logger.warning(f"{tapper.session_name} | Turbo end time is already past on the local clock, "
+                                  f"using a {TURBO_DURATION}s window")
+        self.interval = settings.TURBO_TAP_INTERVAL
+
+        self.requests = 0
+        self.taps = 0
+        self.coins = 0
+
+    async def submit(self, http_client: aiohttp.ClientSession, taps: int) -> PlayerState:
+        tapper = self.tapper
+
+        tapper.pending_taps = asyncio.ensure_future(tapper.send_taps(http_client=http_client, taps=taps))
+        try:
+            return await asyncio.shield(tapper.pending_taps)
+        finally:
+            tapper.pending_taps = None
+
+    def record(self, player: PlayerState, taps: int) -> None:
+        tapper = self.tapper
+        session_name = tapper.session_name
+
+        coins = max(player.shares - tapper.balance, 0) if tapper.balance is not None else 0
+        tapper.balance = player.shares
+        if tapper.energy_model:
+            tapper.energy_model.update(player=player)
+
+        self.requests += 1
+        self.taps += taps
+        self.coins += coins
+
+        TAPS.inc(taps, session=session_name)
+        COINS.inc(coins, session=session_name)
+        stats.record_taps(session_name, taps=taps, coins=coins, balance=player.shares)
+
+        if player.turbo_end:
+            now = monotonic()
+            self.deadline = min(self.deadline, get_turbo_deadline(player.turbo_end, started_at=now))
+
+    def credited_taps(self) -> int:
+        energy_model = self.tapper.energy_model
+        tap_reward = energy_model.tap_reward if energy_model and energy_model.ready else 1
+
+        return self.coins // max(tap_reward * TURBO_TAP_MULTIPLIER, 1)
+
+    async def run(self, http_client: aiohttp.ClientSession) -> None:
+        tapper = self.tapper
+
+        while self.deadline > monotonic():
+            sent_at = monotonic()
+            taps = tapper.tap_controller.random_batch() + settings.ADD_TAPS_ON_TURBO
+
+            try:
+                player = await self.submit(http_client=http_client, taps=taps)
+            except (InvalidToken, CircuitOpen) as error:
+                raise error
+            except aiohttp.ClientResponseError as error:
+                if error.status == 429:
+                    self.interval = max(self.interval * 2, get_retry_after(error) or 0)
+                    tapper.logger.info(f"{tapper.session_name} | Turbo taps throttled, "
+                                       f"slow down to one request per {self.interval:.1f}s")
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, KeyError):
+                pass
+            else:
+                self.record(player=player, taps=taps)
+
+            delay = min(sent_at + self.interval, self.deadline) - monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay=delay)
+
+        credited_taps = self.credited_taps()
+        TURBO_TAPS.inc(credited_taps, session=tapper.session_name)
+
+        tapper.logger.success(f"{tapper.session_name} | Turbo finished in {monotonic() - self.started_at:.1f}s | "
+                              f"Requests: {self.requests} | Taps sent: {self.taps:,} | "
+                              f"Credited: <g>{credited_taps:,}</g> taps (<g>+{self.coins:,}</g>)")
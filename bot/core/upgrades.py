@@ -0,0 +1,45 @@
+from bot.config import settings
+from .energy import EnergyModel
+
+
+def get_upgrade_limits() -> dict[str, int]:
+    limits = {}
+
+    if settings.AUTO_UPGRADE_TAP is True:
+        limits['tap'] = settings.MAX_TAP_LEVEL
+    if settings.AUTO_UPGRADE_ENERGY is True:
+        limits['energy'] = settings.MAX_ENERGY_LEVEL
+    if settings.AUTO_UPGRADE_CHARGE is True:
+        limits['charge'] = settings.MAX_CHARGE_LEVEL
+
+    return limits
+
+
+def plan_upgrades(energy_model: EnergyModel, balance: int) -> list[tuple[str, int, int]]:
+    limits = get_upgrade_limits()
+    model = energy_model
+    plan = []
+
+    while True:
+        base_yield = model.coins_per_hour()
+        candidates = []
+
+        for boost_type, max_level in limits.items():
+            next_level = model.level(boost_type) + 1
+            price = model.price(boost_type, next_level)
+
+            if next_level > max_level or price is None or balance <= price:
+                continue
+
+            upgraded = model.with_level(boost_type, next_level)
+            gain = upgraded.coins_per_hour() - base_yield
+
+            candidates.append((gain / max(price, 1), -price, boost_type, next_level, price, upgraded))
+
+        if not candidates:
+            return plan
+
+        _, _, boost_type, next_level, price, model = max(candidates, key=lambda candidate: candidate[:2])
+
+        balance -= price
+        plan.append((boost_type, next_level, price))
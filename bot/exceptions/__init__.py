@@ -1,2 +1,13 @@
 class InvalidSession(BaseException):
     ...
+
+
+class InvalidToken(Exception):
+    ...
+
+
+class CircuitOpen(Exception):
+    def __init__(self, key: str, delay: float):
+        super().__init__(key)
+        self.key = key
+        self.delay = delay
@@ -1,3 +1,5 @@
+from time import monotonic
+
 from pyrogram import Client, filters
 from pyrogram.types import Message
 
@@ -5,6 +7,9 @@ from bot.utils import scripts
 from bot.utils.logger import logger
 from bot.utils.emojis import StaticEmoji
 from bot.utils.launcher import tg_clients, run_tasks
+from bot.core.fleet import fleet
+from bot.utils.stats import stats
+from bot.utils.metrics import LOGIN_QUEUE
 
 
 @Client.on_message(filters.me & filters.chat("me") & filters.command("help", prefixes="/"))
@@ -18,23 +23,87 @@ async def send_help(_: Client, message: Message):
 @scripts.with_args("<b>This command does not work without arguments\n"
                    "Type <code>/tap on</code> to start or <code>/tap off</code> to stop</b>")
 async def launch_tapper(client: Client, message: Message):
-    flag = scripts.get_command_args(message, "tap")
+    flag, _, session_name = scripts.get_command_args(message, "tap").partition(" ")
+    session_name = session_name.strip()
 
     flags_to_start = ["on", "start"]
     flags_to_stop = ["off", "stop"]
 
+    if session_name and session_name not in {tg_client.name for tg_client in tg_clients}:
+        await message.edit(
+            text=f"<b>{StaticEmoji.DENY} Session {scripts.escape_html(session_name)} not found</b>")
+        return
+
     if flag in flags_to_start:
-        logger.info(f"The tapper is launched with the command /tap {flag}\n")
+        clients = [tg_client for tg_client in tg_clients if not session_name or tg_client.name == session_name]
+        clients = [tg_client for tg_client in clients if not fleet.is_running(tg_client.name)]
+
+        if not clients:
+            state = fleet.get_state(session_name) if session_name else "running"
+            await message.edit(
+                text=f"<b>{StaticEmoji.WARNING} Tapper is already running ({state})</b>")
+            return
+
+        logger.info(f"The tapper is launched with the command /tap {flag} {session_name}\n")
 
         await message.edit(
-            text=f"<b>{StaticEmoji.ACCEPT} Tapper launched! {StaticEmoji.START}</b>")
-        await run_tasks(tg_clients=tg_clients)
+            text=f"<b>{StaticEmoji.ACCEPT} Tapper launched for {len(clients)} sessions! {StaticEmoji.START}</b>")
+        await run_tasks(tg_clients=clients)
     elif flag in flags_to_stop:
-        logger.info(f"Tapper stopped with /tap command {flag}\n")
+        logger.info(f"Tapper stopped with /tap command {flag} {session_name}\n")
 
-        await scripts.stop_tasks(client=client)
-        await message.edit(
-            text=f"<b>{StaticEmoji.ACCEPT} Tapper stopped! {StaticEmoji.STOP}</b>")
+        if session_name:
+            stopped = await fleet.stop(session_name)
+        else:
+            stopped = bool(fleet.tappers)
+            await fleet.stop_all()
+
+        if stopped:
+            await message.edit(
+                text=f"<b>{StaticEmoji.ACCEPT} Tapper stopped! {StaticEmoji.STOP}</b>")
+        else:
+            await message.edit(
+                text=f"<b>{StaticEmoji.WARNING} Tapper is not running</b>")
     else:
         await message.edit(
             text=f"<b>{StaticEmoji.DENY} This command only accepts the following arguments: on/off | start/stop</b>")
+
+
+def get_fleet_stats_text() -> str:
+    now = monotonic()
+    states = ', '.join(f"{state}: {count}" for state, count in sorted(stats.states.items()) if count) or "no sessions"
+
+    return (f"<b>{StaticEmoji.FLAG} Fleet statistics\n\n"
+            f"{StaticEmoji.ARROW} Sessions: {states}\n"
+            f"{StaticEmoji.ARROW} Taps per minute: {stats.taps.per_minute(now):,.0f}\n"
+            f"{StaticEmoji.DOLLAR} Coins per hour: {stats.coins.per_minute(now) * 60:,.0f}\n"
+            f"{StaticEmoji.ARROW} Login queue: {LOGIN_QUEUE.value():.0f}\n"
+            f"{StaticEmoji.ARROW} Average request latency: {stats.average_latency() * 1000:,.0f} ms</b>")
+
+
+def get_session_stats_text(session_name: str) -> str:
+    session = stats.sessions.get(session_name)
+    if session is None:
+        return f"<b>{StaticEmoji.DENY} No statistics for session {scripts.escape_html(session_name)}</b>"
+
+    now = monotonic()
+    balance = f"{session.balance:,}" if session.balance is not None else "unknown"
+    last_error = f"\n{StaticEmoji.WARNING} Last error: {scripts.escape_html(session.last_error)[:128]}" \
+        if session.last_error else ""
+
+    return (f"<b>{StaticEmoji.FLAG} Session {scripts.escape_html(session_name)}\n\n"
+            f"{StaticEmoji.ARROW} State: {session.state} for {now - session.updated_at:,.0f}s\n"
+            f"{StaticEmoji.DOLLAR} Balance: {balance}\n"
+            f"{StaticEmoji.ARROW} Taps per minute: {session.taps.per_minute(now):,.0f}\n"
+            f"{StaticEmoji.DOLLAR} Coins per hour: {session.coins.per_minute(now) * 60:,.0f}\n"
+            f"{StaticEmoji.ARROW} Errors: {session.errors}{last_error}</b>")
+
+
+@Client.on_message(filters.me & filters.chat("me") & filters.command("stats", prefixes="/"))
+async def send_stats(_: Client, message: Message):
+    session_name = scripts.get_command_args(message, "stats")
+
+    if session_name:
+        await message.edit(text=get_session_stats_text(session_name=session_name))
+    else:
+        await message.edit(text=get_fleet_stats_text())
@@ -0,0 +1,410 @@
+import os
+import re
+import time
+import random
+import shutil
+import pathlib
+import threading
+import subprocess
+from contextlib import contextmanager
+
+from seleniumwire import webdriver
+from seleniumwire.utils import decode
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as ec
+from selenium.webdriver.support.wait import WebDriverWait
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from webdriver_manager.chrome import ChromeDriverManager
+from webdriver_manager.core.os_manager import OperationSystemManager, ChromeType
+
+from bot.config import settings
+from bot.utils import logger
+from bot.utils.metrics import ACTIVE_BROWSERS
+
+
+web_options = ChromeOptions
+web_service = ChromeService
+web_manager = ChromeDriverManager
+web_driver = webdriver.Chrome
+
+WEBDRIVER_DIR = pathlib.Path("webdriver")
+
+device_metrics = {"width": 375, "height": 812, "pixelRatio": 3.0}
+user_agent = "Mozilla/5.0 (Linux; Android 13; RMX3630 Build/TP1A.220905.001; wv) AppleWebKit/537.36 (KHTML, like Gecko) Version/4.0 Chrome/125.0.6422.165 Mobile Safari/537.36"
+
+mobile_emulation = {
+    "deviceMetrics": device_metrics,
+    "userAgent": user_agent,
+}
+
+capture_scopes = [r"^https://api\.tapswap\.club/"]
+blocked_urls = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+                "*.woff", "*.woff2", "*.ttf", "*.otf", "*.mp3", "*.mp4", "*.webm"]
+
+seleniumwire_options = {
+    "request_storage": "memory",
+    "request_storage_max_size": 100,
+}
+
+webdriver_path = None
+provision_lock = threading.Lock()
+
+
+def get_major_version(version: str | None) -> str | None:
+    match = re.search(r'(\d+)\.\d+', version or '')
+
+    return match.group(1) if match else None
+
+
+def get_driver_version(driver_path: pathlib.Path) -> str | None:
+    try:
+        output = subprocess.run([driver_path.as_posix(), "--version"],
+                                capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+    return get_major_version(output)
+
+
+def get_browser_version() -> str | None:
+    try:
+        return get_major_version(OperationSystemManager().get_browser_version_from_os(ChromeType.GOOGLE))
+    except Exception:
+        return None
+
+
+def provision_webdriver() -> str:
+    global webdriver_path
+
+    with provision_lock:
+        if webdriver_path:
+            return webdriver_path
+
+        WEBDRIVER_DIR.mkdir(parents=True, exist_ok=True)
+        drivers = [path for path in WEBDRIVER_DIR.iterdir() if path.is_file()]
+
+        browser_version = get_browser_version()
+        driver_version = get_driver_version(drivers[0]) if drivers else None
+
+        if driver_version is None or (browser_version and driver_version != browser_version):
+            logger.info("Downloading webdriver. It may take some time...")
+
+            for path in drivers:
+                path.unlink()
+
+            downloaded_path = pathlib.Path(web_manager().install())
+            shutil.move(downloaded_path, WEBDRIVER_DIR / downloaded_path.name)
+
+            logger.info("Webdriver downloaded successfully")
+
+        webdriver_path = next(path for path in WEBDRIVER_DIR.iterdir() if path.is_file()).as_posix()
+
+        return webdriver_path
+
+
+def create_options() -> ChromeOptions:
+    options = web_options()
+
+    options.add_experimental_option("mobileEmulation", mobile_emulation)
+
+    options.add_argument("--headless")
+    options.add_argument("--log-level=3")
+    if os.name == 'posix':
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+
+    return options
+
+
+class DriverPool:
+    def __init__(self, size: int, idle_timeout: int, max_uses: int):
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.max_uses = max_uses
+
+        self._idle: list[tuple[webdriver.Chrome, int, float]] = []
+        self.created = 0
+        self.closed = False
+        self._condition = threading.Condition()
+        self._reaper: threading.Thread | None = None
+
+    def _spawn(self) -> webdriver.Chrome:
+        driver = web_driver(service=web_service(provision_webdriver()), options=create_options(),
+                            seleniumwire_options=seleniumwire_options)
+
+        try:
+            driver.scopes = capture_scopes
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_urls})
+        except Exception:
+            self._quit(driver)
+            raise
+
+        return driver
+
+    @staticmethod
+    def _quit(driver: webdriver.Chrome) -> None:
+        try:
+            driver.quit()
+        except Exception:
+            ...
+
+    @staticmethod
+    def _reset(driver: webdriver.Chrome) -> None:
+        del driver.requests
+        del driver.response_interceptor
+        driver.proxy = {}
+        driver.get("about:blank")
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": "https://app.tapswap.club",
+                                                               "storageTypes": "all"})
+
+    def _evict_idle(self) -> list[webdriver.Chrome]:
+        now = time.monotonic()
+        expired = [item for item in self._idle if now - item[2] >= self.idle_timeout]
+        if expired:
+            self._idle = [item for item in self._idle if item not in expired]
+            self.created -= len(expired)
+
+        return [driver for driver, _, _ in expired]
+
+    def _start_reaper(self) -> None:
+        if self._reaper is None:
+            self._reaper = threading.Thread(target=self._reap, name="driver-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap(self) -> None:
+        while True:
+            with self._condition:
+                if self.closed or not self._idle:
+                    self._reaper = None
+                    return
+
+                wait = min(idle_since for _, _, idle_since in self._idle) + self.idle_timeout - time.monotonic()
+                if wait > 0:
+                    self._condition.wait(timeout=wait)
+                    continue
+
+                expired = self._evict_idle()
+                self._condition.notify_all()
+
+            for expired_driver in expired:
+                self._quit(expired_driver)
+
+    def acquire(self) -> tuple[webdriver.Chrome, int]:
+        with self._condition:
+            expired = self._evict_idle()
+            while not self._idle and self.created >= self.size:
+                self._condition.wait()
+
+            if self._idle:
+                driver, uses, _ = self._idle.pop()
+            else:
+                driver, uses = None, 0
+                self.created += 1
+
+        for expired_driver in expired:
+            self._quit(expired_driver)
+
+        if driver is None:
+            try:
+                driver = self._spawn()
+            except Exception:
+                with self._condition:
+                    self.created -= 1
+                    self._condition.notify()
+                raise
+
+        return driver, uses
+
+    def release(self, driver: webdriver.Chrome, uses: int) -> None:
+        uses += 1
+        recycle = uses >= self.max_uses or self.closed
+
+        if not recycle:
+            try:
+                self._reset(driver)
+            except Exception:
+                recycle = True
+
+        with self._condition:
+            expired = self._evict_idle()
+            if recycle:
+                self.created -= 1
+                expired.append(driver)
+            else:
+                self._idle.append((driver, uses, time.monotonic()))
+                self._start_reaper()
+            self._condition.notify_all()
+
+        for expired_driver in expired:
+            self._quit(expired_driver)
+
+    def close(self) -> None:
+        with self._condition:
+            self.closed = True
+            idle = [driver for driver, _, _ in self._idle]
+            self.created -= len(idle)
+            self._idle = []
+            self._condition.notify_all()
+
+        for driver in idle:
+            self._quit(driver)
+
+
+driver_pool = DriverPool(size=settings.BROWSER_POOL_SIZE,
+                         idle_timeout=settings.BROWSER_IDLE_TIMEOUT,
+                         max_uses=settings.BROWSER_MAX_USES)
+
+ACTIVE_BROWSERS.set_function(lambda: driver_pool.created)
+
+
+@contextmanager
+def create_webdriver(proxy: str | None = None):
+    driver, uses = driver_pool.acquire()
+    try:
+        if proxy:
+            driver.proxy = {
+                'http': proxy,
+                'https': proxy,
+            }
+        yield driver
+    finally:
+        driver_pool.release(driver, uses)
+
+
+def extract_chq(chq: str) -> int:
+    with create_webdriver() as driver:
+        chq_length = len(chq)
+
+        bytes_array = bytearray(chq_length // 2)
+        xor_key = 157
+
+        for i in range(0, chq_length, 2):
+            bytes_array[i // 2] = int(chq[i:i + 2], 16)
+
+        xor_bytes = bytearray(t ^ xor_key for t in bytes_array)
+        decoded_xor = xor_bytes.decode('utf-8')
+
+        driver.execute_script("""
+            window.ctx = {}
+            window.ctx.api = {}
+            window.ctx.d_headers = new Map()
+            window.ctx.api.setHeaders = function(entries) { for (const [W, U] of Object.entries(entries)) window.ctx.d_headers.set(W, U) }
+            var chrStub = document.createElement("div");
+            chrStub.id = "_chr_";
+            document.body.appendChild(chrStub);
+        """)
+
+        fixed_xor = repr(decoded_xor).replace("`", "\\`")
+
+        chr_key = driver.execute_script(f"""
+            try {{
+                return eval(`{fixed_xor[1:-1]}`);
+            }} catch (e) {{
+                return e;
+            }}
+        """)
+
+        cache_id = driver.execute_script(f"""
+            try {{
+                return window.ctx.d_headers.get('Cache-Id');
+            }} catch (e) {{
+                return e;
+            }}
+        """)
+
+    return chr_key, cache_id
+
+
+CHALLENGE_URL = "https://api.tapswap.club/api/account/challenge"
+SUBMIT_TAPS_URL = "https://api.tapswap.club/api/player/submit_taps"
+
+SKIP_BUTTON_XPATH = '//*[@id="app"]/div[2]/button'
+COIN_XPATH = '//*[@id="ex1-layer"]'
+
+
+class LoginCapture:
+    def __init__(self):
+        self.response_text = '{}'
+        self.x_cv = '651'
+        self.x_touch = '1'
+
+        self.challenge_seen = threading.Event()
+        self.taps_seen = threading.Event()
+
+    def collect(self, request, response) -> None:
+        if request.url == CHALLENGE_URL and 'chr' in request.body.decode('utf-8'):
+            body = decode(response.body, response.headers.get('Content-Encoding', 'identity'))
+            self.response_text = body.decode('utf-8')
+            self.challenge_seen.set()
+
+        if request.url == SUBMIT_TAPS_URL:
+            headers = dict(request.headers.items())
+            self.x_cv = headers.get('X-Cv') or headers.get('x-cv')
+            self.x_touch = headers.get('X-Touch', '') or headers.get('x-touch', '')
+            self.taps_seen.set()
+
+
+def click_element(driver: webdriver.Chrome, xpath: str, timeout: float = 0) -> bool:
+    try:
+        if timeout:
+            element = WebDriverWait(driver, timeout).until(ec.element_to_be_clickable((By.XPATH, xpath)))
+        else:
+            element = driver.find_element(By.XPATH, xpath)
+        element.click()
+
+        return True
+    except:
+        return False
+
+
+def wait_login_by_sleeps(driver: webdriver.Chrome, capture: LoginCapture) -> None:
+    time.sleep(random.randint(7, 15))
+
+    if click_element(driver, SKIP_BUTTON_XPATH):
+        time.sleep(random.randint(2, 5))
+
+    click_element(driver, COIN_XPATH)
+
+    time.sleep(5)
+
+    for request in driver.requests:
+        if request.response:
+            capture.collect(request, request.response)
+
+
+def wait_login_by_events(driver: webdriver.Chrome, capture: LoginCapture) -> None:
+    deadline = time.monotonic() + settings.LOGIN_TIMEOUT
+
+    if not capture.challenge_seen.wait(timeout=max(deadline - time.monotonic(), 0)):
+        return
+
+    click_element(driver, SKIP_BUTTON_XPATH, timeout=3)
+
+    while not capture.taps_seen.is_set() and time.monotonic() < deadline:
+        click_element(driver, COIN_XPATH, timeout=min(3, max(deadline - time.monotonic(), 0.1)))
+        capture.taps_seen.wait(timeout=min(1, max(deadline - time.monotonic(), 0)))
+
+
+# Other way
+def login_in_browser(auth_url: str, proxy: str) -> tuple[str, str, str]:
+    capture = LoginCapture()
+
+    with create_webdriver(proxy=proxy) as driver:
+        if settings.LOGIN_WAIT_EVENTS:
+            driver.response_interceptor = capture.collect
+            driver.get(auth_url)
+
+            wait_login_by_events(driver, capture)
+        else:
+            driver.get(auth_url)
+
+            wait_login_by_sleeps(driver, capture)
+
+    return capture.response_text, capture.x_cv, capture.x_touch
+
+
+if __name__ == '__main__':
+    logger.info(f"Webdriver ready: {provision_webdriver()}")
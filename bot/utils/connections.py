@@ -0,0 +1,63 @@
+import weakref
+
+import aiohttp
+from aiocfscrape import CloudflareScraper
+from aiohttp_proxy import ProxyConnector
+
+from bot.config import settings
+
+
+class ConnectionPool:
+    def __init__(self):
+        self.connectors: dict[str | None, aiohttp.TCPConnector] = {}
+        self.clients: dict[str | None, weakref.WeakSet[aiohttp.ClientSession]] = {}
+
+    def get_connector(self, proxy: str | None) -> aiohttp.TCPConnector:
+        connector = self.connectors.get(proxy)
+
+        if connector is None or connector.closed:
+            connector_options = dict(
+                limit=settings.HTTP_POOL_LIMIT,
+                limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+                ttl_dns_cache=settings.DNS_CACHE_TTL,
+            )
+
+            if proxy:
+                connector = ProxyConnector.from_url(proxy, **connector_options)
+            else:
+                connector = aiohttp.TCPConnector(**connector_options)
+
+            self.connectors[proxy] = connector
+
+        return connector
+
+    def create_session(self, proxy: str | None, headers: dict[str, str]) -> aiohttp.ClientSession:
+        http_client = CloudflareScraper(headers=headers, connector=self.get_connector(proxy), connector_owner=False)
+        self.clients.setdefault(proxy, weakref.WeakSet()).add(http_client)
+
+        return http_client
+
+    async def prune(self) -> int:
+        unused = [proxy for proxy in self.connectors
+                  if all(http_client.closed for http_client in self.clients.get(proxy, ()))]
+
+        for proxy in unused:
+            connector = self.connectors.pop(proxy)
+            self.clients.pop(proxy, None)
+
+            if not connector.closed:
+                await connector.close()
+
+        return len(unused)
+
+    async def close(self) -> None:
+        connectors = list(self.connectors.values())
+        self.connectors.clear()
+        self.clients.clear()
+
+        for connector in connectors:
+            if not connector.closed:
+                await connector.close()
+
+
+connection_pool = ConnectionPool()
@@ -1,14 +1,19 @@
 import asyncio
 import argparse
-from itertools import cycle
 
 from pyrogram import Client, compose
 
 from bot.config import settings
 from bot.utils import logger
-from bot.core.tapper import run_tapper
+from bot.core.tapper import Tapper
+from bot.core.fleet import fleet
 from bot.core.registrator import register_sessions
-from bot.utils.scripts import get_session_names, get_proxies
+from bot.utils.scripts import get_session_names, get_session_files, get_proxies, get_mtime, escape_html, PROXIES_FILE
+from bot.utils.workers import run_workers
+from bot.utils.storage import SessionStorage
+from bot.utils.proxies import proxy_manager
+from bot.utils.connections import connection_pool
+from bot.utils.metrics import start_metrics_server
 
 banner = """
 
@@ -30,10 +35,21 @@ Select an action:
 global tg_clients
 
 
-async def get_tg_clients() -> list[Client]:
+def create_tg_client(session_name: str) -> Client:
+    return Client(
+        name=session_name,
+        api_id=settings.API_ID,
+        api_hash=settings.API_HASH,
+        workdir="sessions/",
+        plugins=dict(root="bot/plugins"),
+    )
+
+
+async def get_tg_clients(session_names: list[str] | None = None) -> list[Client]:
     global tg_clients
 
-    session_names = get_session_names()
+    if session_names is None:
+        session_names = get_session_names()
 
     if not session_names:
         raise FileNotFoundError("Not found session files")
@@ -41,16 +57,7 @@ async def get_tg_clients() -> list[Client]:
     if not settings.API_ID or not settings.API_HASH:
         raise ValueError("API_ID and API_HASH not found in the .env file.")
 
-    tg_clients = [
-        Client(
-            name=session_name,
-            api_id=settings.API_ID,
-            api_hash=settings.API_HASH,
-            workdir="sessions/",
-            plugins=dict(root="bot/plugins"),
-        )
-        for session_name in session_names
-    ]
+    tg_clients = [create_tg_client(session_name) for session_name in session_names]
 
     return tg_clients
 
@@ -58,12 +65,14 @@ async def get_tg_clients() -> list[Client]:
 async def process() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("-a", "--action", type=int, help="Action to perform")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Number of worker processes for the clicker")
 
     print(banner)
 
     logger.info(f"Detected {len(get_session_names())} sessions | {len(get_proxies())} proxies")
 
-    action = parser.parse_args().action
+    args = parser.parse_args()
+    action = args.action
 
     if not action:
         print(options)
@@ -82,10 +91,18 @@ async def process() -> None:
     if action == 1:
         await register_sessions()
     elif action == 2:
+        if args.workers > 1:
+            await run_workers(workers=args.workers)
+            return
+
+        await start_metrics_server()
+
         tg_clients = await get_tg_clients()
 
-        await run_tasks(tg_clients=tg_clients)
+        await run_tasks(tg_clients=tg_clients, hot_reload=settings.HOT_RELOAD)
     elif action == 3:
+        await start_metrics_server()
+
         tg_clients = await get_tg_clients()
 
         logger.info("Send /help command in Saved Messages\n")
@@ -93,20 +110,85 @@ async def process() -> None:
         await compose(tg_clients)
 
 
-async def run_tasks(tg_clients: list[Client]):
-    proxies = get_proxies()
-    proxies_cycle = cycle(proxies) if proxies else None
-    lock = asyncio.Lock()
+async def run_tasks(tg_clients: list[Client], proxies: list[str] | None = None, hot_reload: bool = False,
+                    assignments: dict[str, str] | None = None):
+    if fleet.running:
+        started = [tg_client.name for tg_client in tg_clients if fleet.start(Tapper(tg_client=tg_client))]
+        logger.info(f"Added {len(started)} sessions to the running tapper")
+        return
+
+    fleet.running = True
+
+    watchers = []
+    try:
+        if proxies is None:
+            proxies = get_proxies()
+
+        if proxies:
+            proxy_manager.set_proxies(proxies, assignments=assignments)
+            await proxy_manager.check_all()
+
+        for tg_client in tg_clients:
+            fleet.start(Tapper(tg_client=tg_client))
+
+        if proxies or hot_reload:
+            watchers.append(asyncio.create_task(watch_proxies()))
+        if hot_reload:
+            watchers.append(asyncio.create_task(watch_inventory()))
+
+        await fleet.run(keep_alive=hot_reload)
+    finally:
+        for watcher in watchers:
+            watcher.cancel()
+
+        await fleet.close()
+        fleet.running = False
+
+
+async def watch_proxies():
+    await proxy_manager.watch(on_move=fleet.move)
+
+
+async def watch_inventory():
+    session_files = get_session_files()
+    proxies_mtime = get_mtime(PROXIES_FILE)
+
+    while True:
+        await asyncio.sleep(delay=settings.INVENTORY_CHECK_INTERVAL)
+
+        try:
+            current_files = get_session_files()
+
+            for session_name in session_files.keys() - current_files.keys():
+                logger.info(f"{session_name} | Session file removed, stopping")
+                await fleet.stop(session_name)
+
+            for session_name, account_id in current_files.items():
+                previous_id = session_files.get(session_name)
+
+                if session_name not in session_files:
+                    logger.info(f"{session_name} | New session file found, starting")
+                elif account_id and previous_id and account_id != previous_id:
+                    logger.info(f"{session_name} | Session file now holds another account, restarting")
+                    await fleet.stop(session_name)
+                    SessionStorage(session_name=session_name).clear()
+                else:
+                    continue
+
+                fleet.start(Tapper(tg_client=create_tg_client(session_name)))
+
+            session_files = {session_name: account_id or session_files.get(session_name)
+                             for session_name, account_id in current_files.items()}
+
+            mtime = get_mtime(PROXIES_FILE)
+            if mtime != proxies_mtime:
+                proxies_mtime = mtime
 
-    tasks = [
-        asyncio.create_task(
-            run_tapper(
-                tg_client=tg_client,
-                proxy=next(proxies_cycle) if proxies_cycle else None,
-                lock=lock,
-            )
-        )
-        for tg_client in tg_clients
-    ]
+                proxy_manager.set_proxies(get_proxies())
+                await proxy_manager.check_all()
+                fleet.rebind_proxies()
+                await connection_pool.prune()
 
-    await asyncio.gather(*tasks)
+                logger.info(f"Proxy list reloaded | {len(proxy_manager.stats)} proxies")
+        except Exception as error:
+            logger.error(f"Unknown error while reloading sessions and proxies: {escape_html(error)}")
@@ -1,10 +1,49 @@
 import sys
+import json
+import random
 from loguru import logger
 
+from bot.config import settings
+
+
+log_format = ("<white>{time:YYYY-MM-DD HH:mm:ss}</white>"
+              " | <level>{level: <8}</level>"
+              " | <cyan><b>{line}</b></cyan>"
+              " - <white><b>{message}</b></white>")
+
+
+def log_filter(record: dict) -> bool:
+    session_name = record["extra"].get("session_name")
+
+    session_level = settings.LOG_SESSION_LEVELS.get(session_name) if session_name else None
+    if session_level and record["level"].no < logger.level(session_level.upper()).no:
+        return False
+
+    if record["extra"].get("routine") and settings.LOG_SAMPLE_RATE < 1:
+        return random.random() < settings.LOG_SAMPLE_RATE
+
+    return True
+
+
+def json_format(record: dict) -> str:
+    record["extra"]["json"] = json.dumps({
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "session_name": record["extra"].get("session_name"),
+        "message": record["message"],
+    }, ensure_ascii=False)
+
+    return "{extra[json]}\n"
+
+
+sink_format = json_format if settings.LOG_JSON else log_format
 
 logger.remove()
-logger.add(sink=sys.stdout, format="<white>{time:YYYY-MM-DD HH:mm:ss}</white>"
-                                   " | <level>{level: <8}</level>"
-                                   " | <cyan><b>{line}</b></cyan>"
-                                   " - <white><b>{message}</b></white>")
+logger.add(sink=sys.stdout, format=sink_format, filter=log_filter, enqueue=True)
+
+if settings.LOG_FILE:
+    logger.add(sink=settings.LOG_FILE, format=sink_format, filter=log_filter, enqueue=True,
+               rotation=settings.LOG_ROTATION, retention=settings.LOG_RETENTION,
+               buffering=settings.LOG_BUFFER_SIZE, encoding="utf-8")
+
 logger = logger.opt(colors=True)
@@ -0,0 +1,162 @@
+import threading
+from typing import Callable
+
+from aiohttp import web
+
+from bot.config import settings
+from bot.utils import logger
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels: tuple[tuple[str, str], ...]) -> str:
+    if not labels:
+        return ''
+
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in labels) + '}'
+
+
+class Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self.lock = threading.Lock()
+
+        registry.append(self)
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines += self.samples()
+
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name=name, documentation=documentation)
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self.lock:
+            return self.values.get(tuple(sorted(labels.items())), 0)
+
+    def samples(self) -> list[str]:
+        with self.lock:
+            return [f"{self.name}{format_labels(key)} {value}" for key, value in self.values.items()]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name=name, documentation=documentation)
+        self.function: Callable[[], float] | None = None
+
+    def set(self, value: float, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.values[key] = value
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self.function = function
+
+    def samples(self) -> list[str]:
+        if self.function is not None:
+            return [f"{self.name} {self.function()}"]
+
+        return super().samples()
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name=name, documentation=documentation)
+        self.buckets = buckets
+        self.values: dict[tuple, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            bucket_counts, totals = self.values.setdefault(key, ([0] * len(self.buckets), [0, 0.0]))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    bucket_counts[index] += 1
+            totals[0] += 1
+            totals[1] += value
+
+    def samples(self) -> list[str]:
+        lines = []
+        with self.lock:
+            for key, (bucket_counts, (count, total)) in self.values.items():
+                for bound, bucket_count in zip(self.buckets, bucket_counts):
+                    lines.append(f"{self.name}_bucket{format_labels(key + (('le', bound),))} {bucket_count}")
+                lines.append(f"{self.name}_bucket{format_labels(key + (('le', '+Inf'),))} {count}")
+                lines.append(f"{self.name}_sum{format_labels(key)} {total}")
+                lines.append(f"{self.name}_count{format_labels(key)} {count}")
+
+        return lines
+
+
+registry: list[Metric] = []
+
+
+def render_metrics() -> str:
+    return '\n'.join(metric.render() for metric in registry) + '\n'
+
+
+async def handle_metrics(_: web.Request) -> web.Response:
+    return web.Response(text=render_metrics(), content_type='text/plain', charset='utf-8',
+                        headers={'X-Content-Type-Options': 'nosniff'})
+
+
+metrics_runner: web.AppRunner | None = None
+
+
+async def start_metrics_server(port: int | None = None) -> None:
+    global metrics_runner
+
+    port = port or settings.METRICS_PORT
+    if not port or metrics_runner is not None:
+        return
+
+    app = web.Application()
+    app.add_routes([web.get('/metrics', handle_metrics)])
+
+    metrics_runner = web.AppRunner(app, access_log=None)
+    await metrics_runner.setup()
+    await web.TCPSite(metrics_runner, host=settings.METRICS_HOST, port=port).start()
+
+    logger.info(f"Metrics available at http://{settings.METRICS_HOST}:{port}/metrics")
+
+
+TAPS = Counter('tapswap_taps_total', 'Taps sent to the server')
+COINS = Counter('tapswap_coins_earned_total', 'Coins credited by the server')
+REQUEST_DURATION = Histogram('tapswap_request_duration_seconds', 'Duration of Telegram, login and API calls')
+ERRORS = Counter('tapswap_errors_total', 'Failed calls by endpoint')
+TURBO_TAPS = Counter('tapswap_turbo_taps_credited_total', 'Taps the server credited inside turbo windows')
+BOOSTS = Counter('tapswap_boosts_applied_total', 'Daily boosts applied')
+UPGRADES = Counter('tapswap_upgrades_total', 'Upgrades bought')
+SLEEP = Counter('tapswap_sleep_seconds_total', 'Time sessions spent sleeping')
+LOGIN_QUEUE = Gauge('tapswap_login_queue_depth', 'Browser logins waiting for a free slot')
+ACTIVE_BROWSERS = Gauge('tapswap_active_browsers', 'Headless browsers currently running')
+OPEN_CIRCUITS = Gauge('tapswap_circuit_open', 'Whether requests through a host or proxy are parked')
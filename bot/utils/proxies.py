@@ -0,0 +1,167 @@
+import math
+import asyncio
+from time import time, monotonic
+from collections import deque
+from typing import Callable
+
+import aiohttp
+from aiohttp_proxy import ProxyConnector
+
+from bot.config import settings
+from bot.utils import logger
+from bot.utils.scripts import escape_html
+from bot.utils.connections import connection_pool
+
+CHECK_HISTORY = 10
+LATENCY_SMOOTHING = 0.3
+
+
+class ProxyStats:
+    def __init__(self):
+        self.latency: float | None = None
+        self.results: deque[bool] = deque(maxlen=CHECK_HISTORY)
+        self.checked_at = 0.0
+
+    @property
+    def failure_rate(self) -> float:
+        if not self.results:
+            return 0.0
+
+        return self.results.count(False) / len(self.results)
+
+    @property
+    def healthy(self) -> bool:
+        if not self.results or self.results[-1] is False:
+            return False
+
+        return (self.failure_rate <= settings.PROXY_MAX_FAILURE_RATE
+                and self.latency is not None
+                and self.latency <= settings.PROXY_MAX_LATENCY)
+
+    def record(self, latency: float | None) -> None:
+        self.checked_at = time()
+        self.results.append(latency is not None)
+
+        if latency is not None:
+            if self.latency is None:
+                self.latency = latency
+            else:
+                self.latency += (latency - self.latency) * LATENCY_SMOOTHING
+
+
+class ProxyManager:
+    def __init__(self):
+        self.stats: dict[str, ProxyStats] = {}
+        self.assignments: dict[str, str] = {}
+
+    def set_proxies(self, proxies: list[str], assignments: dict[str, str] | None = None) -> None:
+        proxies = list(dict.fromkeys(proxies))
+
+        self.stats = {proxy: self.stats.get(proxy) or ProxyStats() for proxy in proxies}
+        assignments = {**self.assignments, **(assignments or {})}
+        self.assignments = {session_name: proxy for session_name, proxy in assignments.items() if proxy in self.stats}
+
+    def load(self, proxy: str) -> int:
+        return sum(1 for assigned in self.assignments.values() if assigned == proxy)
+
+    def capacity(self) -> int:
+        if settings.MAX_SESSIONS_PER_PROXY:
+            return settings.MAX_SESSIONS_PER_PROXY
+
+        healthy = sum(1 for stats in self.stats.values() if stats.healthy) or len(self.stats)
+
+        return math.ceil((len(self.assignments) + 1) / max(healthy, 1))
+
+    def is_available(self, proxy: str) -> bool:
+        return self.load(proxy) < self.capacity()
+
+    async def check(self, proxy: str) -> float | None:
+        started_at = monotonic()
+        try:
+            async with aiohttp.ClientSession(connector=ProxyConnector.from_url(proxy)) as http_client:
+                async with http_client.get(url=settings.PROXY_CHECK_URL,
+                                           timeout=aiohttp.ClientTimeout(settings.PROXY_CHECK_TIMEOUT)) as response:
+                    response.raise_for_status()
+                    await response.read()
+
+            return monotonic() - started_at
+        except Exception as error:
+            logger.warning(f"Proxy: {proxy} | Check failed: {escape_html(error)}")
+
+            return None
+
+    async def check_all(self, force: bool = False) -> None:
+        semaphore = asyncio.Semaphore(settings.PROXY_CHECK_CONCURRENCY)
+
+        async def check_one(proxy: str, stats: ProxyStats) -> None:
+            if not force and time() - stats.checked_at < settings.PROXY_CHECK_TTL:
+                return
+
+            async with semaphore:
+                stats.record(await self.check(proxy))
+
+        await asyncio.gather(*(check_one(proxy, stats) for proxy, stats in self.stats.items()))
+
+        healthy = sum(1 for stats in self.stats.values() if stats.healthy)
+        logger.info(f"Proxy check finished | Healthy: {healthy}/{len(self.stats)}")
+
+    def pick(self, exclude: str | None = None) -> str | None:
+        candidates = [proxy for proxy in self.stats if proxy != exclude] or list(self.stats)
+        if not candidates:
+            return None
+
+        healthy = [proxy for proxy in candidates if self.stats[proxy].healthy and self.is_available(proxy)]
+        if healthy:
+            return min(healthy, key=lambda proxy: (self.load(proxy), self.stats[proxy].latency))
+
+        return min(candidates, key=lambda proxy: (not self.is_available(proxy),
+                                                  self.stats[proxy].failure_rate,
+                                                  self.load(proxy)))
+
+    def assign(self, session_name: str) -> str | None:
+        proxy = self.assignments.get(session_name)
+        if proxy is None:
+            proxy = self.pick()
+            if proxy is not None:
+                self.assignments[session_name] = proxy
+
+        return proxy
+
+    def release(self, session_name: str) -> None:
+        self.assignments.pop(session_name, None)
+
+    def rebalance(self) -> dict[str, str]:
+        moved = {}
+
+        for session_name, proxy in list(self.assignments.items()):
+            if self.stats[proxy].healthy:
+                continue
+
+            new_proxy = self.pick(exclude=proxy)
+            if new_proxy is None or new_proxy == proxy:
+                continue
+
+            if not self.stats[new_proxy].healthy or not self.is_available(new_proxy):
+                continue
+
+            self.assignments[session_name] = new_proxy
+            moved[session_name] = new_proxy
+
+        return moved
+
+    async def watch(self, on_move: Callable[[str, str], None]) -> None:
+        while True:
+            await asyncio.sleep(delay=settings.PROXY_CHECK_INTERVAL)
+            await connection_pool.prune()
+
+            if not self.stats:
+                continue
+
+            await self.check_all(force=True)
+
+            for session_name, proxy in self.rebalance().items():
+                logger.info(f"{session_name} | Proxy degraded, moving to {proxy}")
+                on_move(session_name, proxy)
+
+
+proxy_manager = ProxyManager()
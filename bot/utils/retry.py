@@ -0,0 +1,153 @@
+import random
+import asyncio
+from time import time, monotonic
+from email.utils import parsedate_to_datetime
+
+import aiohttp
+
+from bot.config import settings
+from bot.utils import logger
+from bot.utils.metrics import OPEN_CIRCUITS
+from bot.exceptions import CircuitOpen
+
+
+def get_retry_after(error: aiohttp.ClientResponseError) -> float | None:
+    value = (error.headers or {}).get('Retry-After')
+    if not value:
+        return None
+
+    if value.isdigit():
+        return float(value)
+
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+class Backoff:
+    def __init__(self, base: float, cap: float):
+        self.base = base
+        self.cap = cap
+        self.attempts = 0
+
+    def reset(self) -> None:
+        self.attempts = 0
+
+    def next_delay(self) -> float:
+        ceiling = min(self.cap, self.base * 2 ** self.attempts)
+        self.attempts += 1
+
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+    def delay_for(self, error: BaseException) -> float:
+        if isinstance(error, CircuitOpen):
+            return error.delay
+
+        if isinstance(error, aiohttp.ClientResponseError) and error.status == 429:
+            retry_after = get_retry_after(error)
+            if retry_after is not None:
+                self.attempts += 1
+                return min(max(retry_after, self.base), self.cap)
+
+        return self.next_delay()
+
+
+class RateLimiter:
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated_at = monotonic()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+
+        while True:
+            now = monotonic()
+            self.tokens = min(self.tokens + (now - self.updated_at) * self.rate, max(self.rate, 1))
+            self.updated_at = now
+
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+
+            await asyncio.sleep(delay=(1 - self.tokens) / self.rate)
+
+
+class CircuitBreaker:
+    def __init__(self, key: str):
+        self.key = key
+        self.failures = 0
+        self.opened = 0
+        self.open_until = 0.0
+        self.probing = False
+
+    @property
+    def is_open(self) -> bool:
+        return self.open_until > 0
+
+    def check(self) -> None:
+        if not self.is_open:
+            return
+
+        now = monotonic()
+        if now < self.open_until:
+            raise CircuitOpen(self.key, delay=self.open_until - now + random.uniform(0, 1))
+
+        if self.probing:
+            raise CircuitOpen(self.key, delay=random.uniform(1, 3))
+
+    def acquire(self) -> None:
+        self.check()
+
+        if self.is_open:
+            self.probing = True
+
+    def release(self) -> None:
+        self.probing = False
+
+    def record_success(self) -> None:
+        if self.is_open:
+            logger.info(f"Circuit {self.key} | Probe succeeded, resuming sessions")
+            OPEN_CIRCUITS.set(0, key=self.key)
+
+        self.failures = 0
+        self.opened = 0
+        self.open_until = 0.0
+        self.probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+
+        if self.probing or self.failures >= settings.BREAKER_FAILURE_THRESHOLD:
+            timeout = min(settings.BREAKER_RESET_TIMEOUT * 2 ** self.opened, settings.RETRY_MAX_DELAY)
+            self.opened += 1
+            self.open_until = monotonic() + timeout
+            self.probing = False
+
+            logger.warning(f"Circuit {self.key} | {self.failures} failures in a row, "
+                           f"parking sessions for {timeout:.0f}s")
+            OPEN_CIRCUITS.set(1, key=self.key)
+
+
+breakers: dict[str, CircuitBreaker] = {}
+
+
+def acquire_breakers(*circuits: CircuitBreaker) -> None:
+    for breaker in circuits:
+        breaker.check()
+
+    for breaker in circuits:
+        breaker.acquire()
+
+
+def get_breaker(key: str) -> CircuitBreaker:
+    breaker = breakers.get(key)
+    if breaker is None:
+        breaker = breakers[key] = CircuitBreaker(key)
+
+    return breaker
+
+
+request_limiter = RateLimiter(rate=settings.SCHEDULER_MAX_RPS)
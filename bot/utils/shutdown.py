@@ -0,0 +1,38 @@
+import os
+import sys
+import signal
+import asyncio
+
+from bot.utils import logger
+from bot.utils.scripts import login_executor
+from bot.utils.connections import connection_pool
+
+
+def cancel_on_signals(*signals: signal.Signals) -> None:
+    if os.name != 'posix':
+        return
+
+    signals = signals or (signal.SIGTERM,)
+    loop = asyncio.get_running_loop()
+    task = asyncio.current_task()
+
+    def cancel() -> None:
+        for signum in signals:
+            loop.add_signal_handler(signum, lambda: None)
+
+        task.cancel()
+
+    for signum in signals:
+        loop.add_signal_handler(signum, cancel)
+
+
+async def close_resources() -> None:
+    await connection_pool.close()
+
+    browser = sys.modules.get('bot.utils.browser')
+    if browser is not None:
+        await asyncio.to_thread(browser.driver_pool.close)
+
+    login_executor.shutdown(wait=False, cancel_futures=True)
+
+    logger.info("Connections and browsers closed")
@@ -0,0 +1,113 @@
+from time import monotonic
+from collections import Counter
+
+WINDOW_SPAN = 600
+WINDOW_BUCKETS = 10
+
+
+class RateWindow:
+    __slots__ = ('width', 'values', 'stamps', 'started_at')
+
+    def __init__(self, span: int = WINDOW_SPAN, buckets: int = WINDOW_BUCKETS):
+        self.width = span / buckets
+        self.values = [0.0] * buckets
+        self.stamps = [-1] * buckets
+        self.started_at = monotonic()
+
+    def add(self, value: float, now: float) -> None:
+        index = int(now // self.width)
+        slot = index % len(self.values)
+
+        if self.stamps[slot] != index:
+            self.stamps[slot] = index
+            self.values[slot] = 0.0
+
+        self.values[slot] += value
+
+    def total(self, now: float) -> float:
+        index = int(now // self.width)
+        return sum(value for value, stamp in zip(self.values, self.stamps) if index - stamp < len(self.values))
+
+    def elapsed(self, now: float) -> float:
+        return max(min(now - self.started_at, self.width * len(self.values)), self.width)
+
+    def per_minute(self, now: float) -> float:
+        return self.total(now) / self.elapsed(now) * 60
+
+
+class SessionStats:
+    __slots__ = ('state', 'balance', 'errors', 'last_error', 'updated_at', 'taps', 'coins')
+
+    def __init__(self):
+        self.state = 'starting'
+        self.balance = None
+        self.errors = 0
+        self.last_error = ''
+        self.updated_at = monotonic()
+        self.taps = RateWindow()
+        self.coins = RateWindow()
+
+
+class FleetStats:
+    def __init__(self):
+        self.sessions: dict[str, SessionStats] = {}
+        self.states = Counter()
+
+        self.taps = RateWindow()
+        self.coins = RateWindow()
+        self.latency_sum = RateWindow()
+        self.latency_count = RateWindow()
+
+    def get(self, session_name: str) -> SessionStats:
+        session = self.sessions.get(session_name)
+        if session is None:
+            session = self.sessions[session_name] = SessionStats()
+            self.states[session.state] += 1
+
+        return session
+
+    def set_state(self, session_name: str, state: str) -> None:
+        session = self.get(session_name)
+        if session.state == state:
+            return
+
+        self.states[session.state] -= 1
+        self.states[state] += 1
+        session.state = state
+        session.updated_at = monotonic()
+
+    def set_sleeping(self, session_name: str) -> None:
+        if self.get(session_name).state == 'active':
+            self.set_state(session_name, 'sleeping')
+
+    def record_taps(self, session_name: str, taps: int, coins: int, balance: int) -> None:
+        now = monotonic()
+        session = self.get(session_name)
+
+        session.balance = balance
+        session.taps.add(taps, now)
+        session.coins.add(coins, now)
+        self.taps.add(taps, now)
+        self.coins.add(coins, now)
+
+    def record_error(self, session_name: str, error: str) -> None:
+        session = self.get(session_name)
+
+        session.errors += 1
+        session.last_error = error
+        self.set_state(session_name, 'error')
+
+    def record_latency(self, seconds: float) -> None:
+        now = monotonic()
+
+        self.latency_sum.add(seconds, now)
+        self.latency_count.add(1, now)
+
+    def average_latency(self) -> float:
+        now = monotonic()
+        count = self.latency_count.total(now)
+
+        return self.latency_sum.total(now) / count if count else 0.0
+
+
+stats = FleetStats()
@@ -0,0 +1,73 @@
+import os
+import json
+import sqlite3
+import hashlib
+
+
+def get_account_id(path: str) -> str | None:
+    try:
+        with sqlite3.connect(f"file:{path}?mode=ro", uri=True) as connection:
+            row = connection.execute("SELECT user_id, auth_key FROM sessions").fetchone()
+    except sqlite3.Error:
+        return None
+
+    if not row:
+        return None
+
+    user_id, auth_key = row
+    if user_id:
+        return str(user_id)
+
+    return hashlib.sha1(auth_key).hexdigest() if auth_key else None
+
+
+class SessionStorage:
+    def __init__(self, session_name: str, workdir: str = "sessions"):
+        self.path = os.path.join(workdir, f"{session_name}.json")
+        self.account_id = get_account_id(os.path.join(workdir, f"{session_name}.session"))
+        self.data = self._load()
+        self.data.pop('session_id', None)
+
+        if self.account_id is not None and self.data.get('account_id') != self.account_id:
+            if 'account_id' in self.data:
+                self.data = {}
+
+            self.data['account_id'] = self.account_id
+
+    def _load(self) -> dict:
+        try:
+            with open(file=self.path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            data = {}
+
+        return data if isinstance(data, dict) else {}
+
+    def _save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+
+        with open(file=tmp_path, mode="w", encoding="utf-8") as file:
+            json.dump(self.data, file)
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(tmp_path, self.path)
+
+    def get(self, key: str, default=None):
+        return self.data.get(key, default)
+
+    def set(self, key: str, value) -> None:
+        self.data[key] = value
+        self._save()
+
+    def clear(self) -> None:
+        self.data = {'account_id': self.account_id} if self.account_id is not None else {}
+
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            ...
+
+    def delete(self, key: str) -> None:
+        if self.data.pop(key, None) is not None:
+            self._save()
@@ -0,0 +1,120 @@
+import signal
+import asyncio
+import threading
+import multiprocessing
+from contextlib import suppress
+from itertools import cycle
+
+from bot.config import settings
+from bot.utils import logger
+from bot.utils.logger import log_filter, sink_format
+from bot.utils.scripts import get_session_names, get_proxies
+
+RESTART_DELAY = 5
+
+
+def drain_logs(log_queue: multiprocessing.Queue) -> None:
+    from loguru import logger as base_logger
+
+    while True:
+        message = log_queue.get()
+        if message is None:
+            return
+
+        level, text = message
+        base_logger.opt(raw=True).log(level, text)
+
+
+def worker_main(index: int, sessions: list[tuple[str, str | None]], log_queue: multiprocessing.Queue) -> None:
+    from loguru import logger as base_logger
+    from bot.utils.launcher import get_tg_clients, run_tasks
+    from bot.utils.metrics import start_metrics_server
+    from bot.utils.shutdown import cancel_on_signals, close_resources
+
+    base_logger.remove()
+    base_logger.add(sink=lambda message: log_queue.put((message.record["level"].name, str(message))),
+                    format=sink_format, filter=log_filter, colorize=False)
+
+    session_names = [session_name for session_name, _ in sessions]
+    assignments = {session_name: proxy for session_name, proxy in sessions if proxy}
+
+    async def run_worker() -> None:
+        logger.info(f"Worker {index} started with {len(session_names)} sessions")
+
+        if settings.METRICS_PORT:
+            await start_metrics_server(port=settings.METRICS_PORT + index + 1)
+
+        cancel_on_signals(signal.SIGINT, signal.SIGTERM)
+
+        try:
+            tg_clients = await get_tg_clients(session_names=session_names)
+            await run_tasks(tg_clients=tg_clients, proxies=list(assignments.values()), assignments=assignments)
+        finally:
+            await close_resources()
+
+    with suppress(KeyboardInterrupt):
+        asyncio.run(run_worker())
+
+
+def split_sessions(workers: int) -> list[list[tuple[str, str | None]]]:
+    proxies = get_proxies()
+    proxies_cycle = cycle(proxies) if proxies else None
+
+    shards = [[] for _ in range(workers)]
+    for index, session_name in enumerate(get_session_names()):
+        proxy = next(proxies_cycle) if proxies_cycle else None
+        shards[index % workers].append((session_name, proxy))
+
+    return [shard for shard in shards if shard]
+
+
+async def run_workers(workers: int) -> None:
+    context = multiprocessing.get_context("spawn")
+    log_queue = context.Queue()
+
+    log_thread = threading.Thread(target=drain_logs, args=(log_queue,), daemon=True)
+    log_thread.start()
+
+    shards = split_sessions(workers=workers)
+
+    def start_worker(index: int) -> multiprocessing.Process:
+        process = context.Process(target=worker_main, args=(index, shards[index], log_queue),
+                                  name=f"worker-{index}", daemon=True)
+        process.start()
+
+        return process
+
+    processes = {index: start_worker(index) for index in range(len(shards))}
+
+    logger.info(f"Started {len(processes)} workers")
+
+    try:
+        while True:
+            await asyncio.sleep(delay=RESTART_DELAY)
+
+            for index, process in list(processes.items()):
+                if process.is_alive():
+                    continue
+
+                if process.exitcode == 0:
+                    logger.info(f"Worker {index} finished")
+                    del processes[index]
+                    continue
+
+                logger.warning(f"Worker {index} exited with code {process.exitcode}, restarting")
+                processes[index] = start_worker(index)
+
+            if not processes:
+                return
+    finally:
+        for process in processes.values():
+            if process.is_alive():
+                process.terminate()
+
+        for process in processes.values():
+            process.join(timeout=settings.SHUTDOWN_TIMEOUT + RESTART_DELAY)
+            if process.is_alive():
+                process.kill()
+
+        log_queue.put(None)
+        log_thread.join(timeout=RESTART_DELAY)
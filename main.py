@@ -2,10 +2,16 @@ import asyncio
 from contextlib import suppress
 
 from bot.utils.launcher import process
+from bot.utils.shutdown import cancel_on_signals, close_resources
 
 
 async def main():
-    await process()
+    cancel_on_signals()
+
+    try:
+        await process()
+    finally:
+        await close_resources()
 
 
 if __name__ == '__main__':